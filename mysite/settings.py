@@ -11,8 +11,7 @@ https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
-import os
+from decouple import Choices, Csv, config
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
 
@@ -43,6 +42,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'polls.middleware.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -57,11 +57,12 @@ AUTHENTICATION_BACKENDS = (
      # username/password authentication
     'django.contrib.auth.backends.ModelBackend',
  )
+# Templates are compiled once per process by the cached loader. APP_DIRS
+# cannot be combined with explicit loaders, so app_directories is listed.
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
+        'DIRS': [BASE_DIR / 'templates'],
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -69,6 +70,12 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -86,6 +93,47 @@ DATABASES = {
     }
 }
 
+# PRAGMAs run on every new SQLite connection (see polls/db.py).
+POLLS_SQLITE_PRAGMAS = {}
+
+# DB_PROFILE=sqlite-production tunes SQLite for many concurrent voters:
+# WAL so reads never wait for writes, persistent connections, a busy timeout
+# instead of "database is locked" errors, and write locks taken up front.
+DB_PROFILE = config('DB_PROFILE', default='default')
+if DB_PROFILE == 'sqlite-production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': config('DB_BUSY_TIMEOUT', default=20, cast=int),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+    POLLS_SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': config('DB_BUSY_TIMEOUT', default=20, cast=int) * 1000,
+        'mmap_size': config('DB_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+        'cache_size': -config('DB_CACHE_KB', default=64 * 1024, cast=int),
+        'temp_store': 'MEMORY',
+    }
+
+# Read replicas for the polls pages (see polls/routers.py). DB_REPLICAS lists
+# SQLite files holding copies of the primary, refreshed for example with
+# ``manage.py polls_sync_replicas``; they become the aliases replica1,
+# replica2, ... For other engines, add the aliases to DATABASES and
+# POLLS_READ_REPLICAS here. POLLS_REPLICA_WEIGHTS gives the share of reads
+# each replica gets (equal by default), and POLLS_REPLICA_PIN_SECONDS how
+# long a client reads from the primary after it writes.
+DB_REPLICAS = config('DB_REPLICAS', default='', cast=Csv())
+POLLS_READ_REPLICAS = []
+for number, replica in enumerate(DB_REPLICAS, 1):
+    DATABASES[f'replica{number}'] = {**DATABASES['default'], 'NAME': replica, 'TEST': {'MIRROR': 'default'}}
+    POLLS_READ_REPLICAS.append(f'replica{number}')
+POLLS_REPLICA_WEIGHTS = config('POLLS_REPLICA_WEIGHTS', default='', cast=Csv(int))
+POLLS_REPLICA_PIN_SECONDS = config('POLLS_REPLICA_PIN_SECONDS', default=5, cast=int)
+DATABASE_ROUTERS = ['polls.routers.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -115,8 +163,6 @@ TIME_ZONE = 'Asia/Bangkok'
 
 USE_I18N = True
 
-USE_L10N = True
-
 USE_TZ = True
 
 
@@ -125,19 +171,121 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.debug',
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
-        },
-    },
-]
 LOGIN_REDIRECT_URL = '/polls/'
+
+# SESSION_PROFILE picks where sessions live: 'db' (Django's default),
+# 'cached_db' (reads served from the cache, writes still go to the table) or
+# 'signed_cookies' (no table at all; the signed, unencrypted session is in
+# the cookie). Outside 'db', messages are kept in their own cookie too, so
+# showing one never writes a session. Sessions are only saved when they
+# change, so anonymous page views never create one. 'cached_db' keeps them in
+# POLLS_SESSION_CACHE, which must be shared by every process so a logout is
+# seen by all of them (see polls/checks.py).
+SESSION_PROFILE = config('SESSION_PROFILE', default='db', cast=Choices(['db', 'cached_db', 'signed_cookies']))
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_PROFILE}'
+POLLS_SESSION_CACHE = config('POLLS_SESSION_CACHE', default='sessions')
+SESSION_CACHE_ALIAS = POLLS_SESSION_CACHE
+SESSION_SAVE_EVERY_REQUEST = False
+if SESSION_PROFILE != 'db':
+    MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Console logging of the polls app; see polls/settings.py.
+from polls.settings import LOGGING  # noqa: E402
+
+# Audit log of votes and logins: JSON lines written in batches by a background
+# thread, rotated by size. Only a sample of vote events is kept when the rate
+# is below 1.
+POLLS_AUDIT_FILE = config('POLLS_AUDIT_FILE', default=str(BASE_DIR / 'audit.jsonl'))
+POLLS_AUDIT_MAX_BYTES = config('POLLS_AUDIT_MAX_BYTES', default=10 * 1024 * 1024, cast=int)
+POLLS_AUDIT_BACKUP_COUNT = config('POLLS_AUDIT_BACKUP_COUNT', default=5, cast=int)
+POLLS_AUDIT_QUEUE_SIZE = config('POLLS_AUDIT_QUEUE_SIZE', default=10000, cast=int)
+POLLS_AUDIT_BATCH_SIZE = config('POLLS_AUDIT_BATCH_SIZE', default=100, cast=int)
+POLLS_AUDIT_FLUSH_INTERVAL = config('POLLS_AUDIT_FLUSH_INTERVAL', default=1.0, cast=float)
+POLLS_AUDIT_VOTE_SAMPLE_RATE = config('POLLS_AUDIT_VOTE_SAMPLE_RATE', default=1.0, cast=float)
+
+# Tests write their audit log to a temporary directory instead of POLLS_AUDIT_FILE.
+TEST_RUNNER = 'polls.test_runner.PollsTestRunner'
+
+# Compile the polls templates and load the URLconf when a WSGI or ASGI
+# worker starts, so its first requests are as fast as later ones.
+POLLS_WARMUP = config('POLLS_WARMUP', default=True, cast=bool)
+
+# Number of questions shown per page on the polls index.
+POLLS_PAGE_SIZE = config('POLLS_PAGE_SIZE', default=10, cast=int)
+
+# Cache alias that stores poll results and how long an entry may live.
+# Entries are also dropped as soon as the question gets a new vote.
+POLLS_RESULTS_CACHE = config('POLLS_RESULTS_CACHE', default='default')
+POLLS_RESULTS_CACHE_TIMEOUT = config('POLLS_RESULTS_CACHE_TIMEOUT', default=3600, cast=int)
+# The default LocMem cache is per process: a vote only refreshes the results
+# of the process that took it, so there results live this many seconds.
+POLLS_RESULTS_LOCAL_TIMEOUT = config('POLLS_RESULTS_LOCAL_TIMEOUT', default=2, cast=int)
+
+# Directory shared by every process on the host. Each process writes its
+# results cache hit/miss counters (read by polls_cache_stats) and request
+# timing histograms (read by polls_stats) to its own files there. The
+# 'sessions' cache alias, also on disk, holds cached_db sessions.
+POLLS_STATS_DIR = config('POLLS_STATS_DIR', default=str(BASE_DIR / '.polls_stats'))
+POLLS_SESSIONS_DIR = config('POLLS_SESSIONS_DIR', default=str(BASE_DIR / '.polls_sessions'))
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': POLLS_SESSIONS_DIR,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+POLLS_STATS_FLUSH_INTERVAL = config('POLLS_STATS_FLUSH_INTERVAL', default=10, cast=float)
+
+# Whole index and results pages cached for visitors without a session.
+# Votes and question edits purge them; the timeout bounds time-based state.
+POLLS_PAGE_CACHE = config('POLLS_PAGE_CACHE', default=True, cast=bool)
+POLLS_PAGE_CACHE_TIMEOUT = config('POLLS_PAGE_CACHE_TIMEOUT', default=60, cast=int)
+
+# Where ``manage.py polls_finalize --archive file`` writes the votes of
+# closed questions.
+POLLS_ARCHIVE_DIR = config('POLLS_ARCHIVE_DIR', default=str(BASE_DIR / 'archive'))
+
+# How long clients and reverse proxies may reuse JSON API responses, in seconds.
+POLLS_API_MAX_AGE = config('POLLS_API_MAX_AGE', default=5, cast=int)
+
+# Live results streams: the pub/sub class that carries vote notifications,
+# the most updates per second one stream sends, and the keep-alive interval.
+POLLS_BROKER = config('POLLS_BROKER', default='polls.broker.LocalBroker')
+POLLS_STREAM_MAX_RATE = config('POLLS_STREAM_MAX_RATE', default=2, cast=float)
+POLLS_STREAM_KEEPALIVE = config('POLLS_STREAM_KEEPALIVE', default=15, cast=float)
+
+# Write-behind voting: queue votes in memory and write them in batches.
+# When the queue is full, votes get a 503 with Retry-After.
+POLLS_VOTE_QUEUE = config('POLLS_VOTE_QUEUE', default=False, cast=bool)
+POLLS_VOTE_QUEUE_SIZE = config('POLLS_VOTE_QUEUE_SIZE', default=10000, cast=int)
+POLLS_VOTE_BATCH_SIZE = config('POLLS_VOTE_BATCH_SIZE', default=500, cast=int)
+POLLS_VOTE_FLUSH_INTERVAL = config('POLLS_VOTE_FLUSH_INTERVAL', default=0.5, cast=float)
+
+# In-memory tally engine (polls/tally.py): votes are counted in memory and
+# the Choice.votes counters are written every POLLS_TALLY_FLUSH_INTERVAL
+# seconds; every POLLS_TALLY_CHECK_INTERVAL seconds (0 turns it off) the
+# counts are compared with the Vote rows and drifted questions reloaded.
+# Only for deployments where a single process serves every vote.
+POLLS_TALLY_ENGINE = config('POLLS_TALLY_ENGINE', default=False, cast=bool)
+POLLS_TALLY_FLUSH_INTERVAL = config('POLLS_TALLY_FLUSH_INTERVAL', default=5.0, cast=float)
+POLLS_TALLY_CHECK_INTERVAL = config('POLLS_TALLY_CHECK_INTERVAL', default=300.0, cast=float)
+
+# Vote rate limits, as a token bucket per user and per client address:
+# tokens refilled per second (0 turns the limit off) and the bucket size.
+# A vote repeating the user's vote of the last POLLS_VOTE_REPEAT_WINDOW
+# seconds is dropped without touching the database.
+POLLS_VOTE_USER_RATE = config('POLLS_VOTE_USER_RATE', default=1.0, cast=float)
+POLLS_VOTE_USER_BURST = config('POLLS_VOTE_USER_BURST', default=5, cast=int)
+POLLS_VOTE_IP_RATE = config('POLLS_VOTE_IP_RATE', default=20.0, cast=float)
+POLLS_VOTE_IP_BURST = config('POLLS_VOTE_IP_BURST', default=100, cast=int)
+POLLS_VOTE_REPEAT_WINDOW = config('POLLS_VOTE_REPEAT_WINDOW', default=10, cast=int)
+
+# Per-view request timing (polls.middleware.TimingMiddleware). Off by default.
+# Histograms are written to POLLS_STATS_DIR every POLLS_TIMING_FLUSH_INTERVAL
+# seconds and read with ``manage.py polls_stats``.
+POLLS_TIMING = config('POLLS_TIMING', default=False, cast=bool)
+POLLS_TIMING_FLUSH_INTERVAL = config('POLLS_TIMING_FLUSH_INTERVAL', default=10, cast=float)
+if POLLS_TIMING:
+    MIDDLEWARE.insert(0, 'polls.middleware.TimingMiddleware')
+    TEMPLATES[0]['BACKEND'] = 'polls.timing.TimedDjangoTemplates'
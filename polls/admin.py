@@ -1,6 +1,11 @@
 """Create choice and question to show in admin page."""
-from django.contrib import admin
-from .models import Question, Choice
+from django.contrib import admin, messages
+from django.db.models import Sum
+from django.utils import timezone
+from .cache import bump_results_version
+from .models import ArchivedVote, Question, Choice, ResultSnapshot, Vote, VoteBucket
+from .pagecache import purge_index
+from .tally import forget
 
 
 class ChoiceInline(admin.TabularInline):
@@ -8,6 +13,8 @@ class ChoiceInline(admin.TabularInline):
 
     model = Choice
     extra = 3
+    # The counter is kept in step with Vote rows by the vote page.
+    readonly_fields = ['votes']
 
 
 class QuestionAdmin(admin.ModelAdmin):
@@ -18,9 +25,85 @@ class QuestionAdmin(admin.ModelAdmin):
         ('Date information', {'fields': ['pub_date', 'end_date']}),
     ]
     inlines = [ChoiceInline]
-    list_display = ('question_text', 'pub_date', 'was_published_recently')
+    list_display = ('question_text', 'pub_date', 'end_date', 'published_recently', 'open', 'total_votes')
     list_filter = ['pub_date']
     search_fields = ['question_text']
+    show_full_result_count = False
+    actions = ['close_polls', 'reset_tallies']
+
+    def get_queryset(self, request):
+        """Annotate each question's state and vote total in the change list query."""
+        return super().get_queryset(request).with_state(timezone.now()).annotate(total_votes=Sum('choice__votes'))
+
+    @admin.display(boolean=True, ordering='pub_date', description='Published recently?')
+    def published_recently(self, question):
+        """Return whether the question was published within the last day."""
+        return question.is_recent
+
+    @admin.display(boolean=True, description='Open?')
+    def open(self, question):
+        """Return whether the question can be voted on."""
+        return question.is_open
+
+    @admin.display(ordering='total_votes', description='Votes')
+    def total_votes(self, question):
+        """Return the sum of the question's choice counters."""
+        return question.total_votes or 0
+
+    def purge(self, question_ids):
+        """Drop the cached pages and in-memory tallies of the questions, as saving each one would."""
+        forget(question_ids)
+        purge_index()
+        for question_id in question_ids:
+            bump_results_version(question_id)
+
+    @admin.action(description='Close selected polls now')
+    def close_polls(self, request, queryset):
+        """End voting on the selected questions with one UPDATE."""
+        question_ids = list(queryset.values_list('pk', flat=True))
+        closed = Question.objects.filter(pk__in=question_ids).update(end_date=timezone.now())
+        self.purge(question_ids)
+        self.message_user(request, f"Closed {closed} poll(s).", messages.SUCCESS)
+
+    @admin.action(description='Reset vote tallies of selected polls')
+    def reset_tallies(self, request, queryset):
+        """Delete every vote of the selected questions and zero their counters."""
+        question_ids = list(queryset.values_list('pk', flat=True))
+        deleted = Vote.objects.filter(question__in=question_ids).delete()[0]
+        for model in (VoteBucket, ArchivedVote, ResultSnapshot):
+            model.objects.filter(question__in=question_ids).delete()
+        Choice.objects.filter(question__in=question_ids).update(votes=0)
+        self.purge(question_ids)
+        self.message_user(request, f"Deleted {deleted} vote(s) from {len(question_ids)} poll(s).", messages.SUCCESS)
+
+
+class VoteAdmin(admin.ModelAdmin):
+    """
+    Browse votes without loading users, questions or choices one row at a time.
+
+    Votes are read only here: they are written by the vote page, which
+    keeps the Choice.votes counters in step.
+    """
+
+    list_display = ('user', 'question', 'choice', 'voted_at')
+    list_select_related = ('user', 'question', 'choice')
+    raw_id_fields = ('user', 'question', 'choice')
+    date_hierarchy = 'voted_at'
+    search_fields = ['user__username']
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        """Votes are only added by voting."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Votes are only changed by voting."""
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        """Use the reset tallies action on questions instead."""
+        return False
 
 
 admin.site.register(Question, QuestionAdmin)
+admin.site.register(Vote, VoteAdmin)
@@ -0,0 +1,95 @@
+"""Read-only JSON API for questions and their results."""
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, set_response_etag
+from django.views.decorators.http import require_safe
+
+from .cache import get_cache, get_results, is_shared, question_dates, results_version
+from .models import Question
+
+
+def cacheable(response):
+    """Let browsers and reverse proxies keep a 200 or 304 response for POLLS_API_MAX_AGE seconds."""
+    if response.status_code in (200, 304):
+        patch_cache_control(response, public=True, max_age=settings.POLLS_API_MAX_AGE)
+    return response
+
+
+@require_safe
+def question_list(request):
+    """
+    Return a page of published questions, newest first.
+
+    ?state=open returns only questions that can be voted on and ?page=
+    picks the page. The ETag is a hash of the body.
+    """
+    now = timezone.now()
+    questions = Question.objects.with_state(now)
+    questions = questions.open(now) if request.GET.get('state') == 'open' else questions.published(now)
+    page = Paginator(questions.order_by('-pub_date'), settings.POLLS_PAGE_SIZE).get_page(request.GET.get('page'))
+    response = JsonResponse({
+        'page': page.number,
+        'pages': page.paginator.num_pages,
+        'questions': [
+            {
+                'id': question.pk,
+                'question_text': question.question_text,
+                'pub_date': question.pub_date,
+                'end_date': question.end_date,
+                'can_vote': question.is_open,
+                'results': reverse('polls:api_results', args=(question.pk,)),
+            }
+            for question in page
+        ],
+    })
+    set_response_etag(response)
+    return cacheable(get_conditional_response(request, etag=response['ETag'], response=response))
+
+
+def results_etag(request, pk):
+    """
+    Return the ETag of a question's results: its id, vote version and whether it is open.
+
+    The open state changes with time alone, so it is part of the tag. With a
+    process-local results cache the version only moves on this process's
+    votes, so the tag also changes every POLLS_RESULTS_LOCAL_TIMEOUT seconds.
+    Return None for a missing question.
+    """
+    version = results_version(pk)
+    dates = question_dates(pk, version)
+    if dates is None:
+        return None
+    if not is_shared(get_cache()):
+        version = f'{version}-t{int(time.time()) // max(settings.POLLS_RESULTS_LOCAL_TIMEOUT, 1)}'
+    state = 'open' if dates[0] <= timezone.now() <= dates[1] else 'closed'
+    return f'"q{pk}-v{version}-{state}"'
+
+
+@require_safe
+async def question_results(request, pk):
+    """Return a question with the vote count of each choice and the total."""
+    etag = await sync_to_async(results_etag)(request, pk)
+    not_modified = etag and get_conditional_response(request, etag=etag)
+    if not_modified:
+        return cacheable(not_modified)
+    question = await aget_object_or_404(Question, pk=pk)
+    choices = await sync_to_async(get_results)(question.pk)
+    response = JsonResponse({
+        'id': question.pk,
+        'question_text': question.question_text,
+        'pub_date': question.pub_date,
+        'end_date': question.end_date,
+        'can_vote': question.can_vote(),
+        'choices': choices,
+        'total': sum(choice['votes'] for choice in choices),
+    })
+    if etag:
+        response['ETag'] = etag
+    return cacheable(response)
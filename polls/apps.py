@@ -7,3 +7,13 @@ class PollsConfig(AppConfig):
     """set name of variable."""
 
     name = 'polls'
+
+    def ready(self):
+        """
+        Register the system checks and connect the database, page cache,
+        login audit and tally signal receivers.
+
+        Django calls this once per process, after every model is loaded, so
+        nothing here depends on the URLconf having been imported.
+        """
+        from . import checks, db, pagecache, signals, tally  # noqa: F401
@@ -0,0 +1,159 @@
+"""Write vote and login events as JSON lines from a background thread."""
+import atexit
+import json
+import logging
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from django.conf import settings
+
+logger = logging.getLogger('polls.audit')
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as one JSON object with its event and audit fields."""
+
+    def format(self, record):
+        """Return the JSON line of `record`, without the newline."""
+        return json.dumps({
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'event': record.getMessage(),
+            **getattr(record, 'audit', {}),
+        })
+
+
+class DroppingQueueHandler(QueueHandler):
+    """A QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, queue):
+        """Create the handler with a dropped record counter."""
+        super().__init__(queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        """Put `record` on the queue, counting it as dropped if there is no room."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """A RotatingFileHandler that writes buffered lines in one call per batch."""
+
+    def __init__(self, filename, batch_size, **kwargs):
+        """Open `filename`, writing whenever `batch_size` lines are buffered."""
+        super().__init__(filename, delay=True, encoding='utf-8', **kwargs)
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def emit(self, record):
+        """Buffer the formatted line, writing the batch when it is full."""
+        try:
+            self.buffer.append(self.format(record) + '\n')
+        except Exception:
+            self.handleError(record)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered lines, rolling the file over once it is too big."""
+        with self.lock:
+            if not self.buffer:
+                return
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(''.join(self.buffer))
+            self.stream.flush()
+            self.buffer = []
+            if self.maxBytes and self.stream.tell() >= self.maxBytes:
+                self.doRollover()
+
+    def close(self):
+        """Write what is left and close the file."""
+        self.flush()
+        super().close()
+
+
+class BatchingQueueListener(QueueListener):
+    """A QueueListener that flushes its handlers when the queue goes quiet."""
+
+    def __init__(self, queue, *handlers, flush_interval):
+        """Listen on `queue`, flushing after `flush_interval` idle seconds."""
+        super().__init__(queue, *handlers)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        """Wait for the next record, flushing the handlers every idle interval."""
+        while True:
+            try:
+                return self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
+
+_listener = None
+_handler = None
+_lock = threading.Lock()
+
+
+def start():
+    """Attach the queue handler to the audit logger and start writing. Runs once."""
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        records = queue.Queue(settings.POLLS_AUDIT_QUEUE_SIZE)
+        handler = BatchedRotatingFileHandler(
+            settings.POLLS_AUDIT_FILE,
+            settings.POLLS_AUDIT_BATCH_SIZE,
+            maxBytes=settings.POLLS_AUDIT_MAX_BYTES,
+            backupCount=settings.POLLS_AUDIT_BACKUP_COUNT,
+        )
+        handler.setFormatter(JsonFormatter())
+        _listener = BatchingQueueListener(records, handler, flush_interval=settings.POLLS_AUDIT_FLUSH_INTERVAL)
+        _handler = DroppingQueueHandler(records)
+        logger.addHandler(_handler)
+        _listener.start()
+        atexit.register(stop)
+
+
+def stop():
+    """Write every queued record and stop the listener."""
+    global _listener, _handler
+    with _lock:
+        if _listener is None:
+            return
+        logger.removeHandler(_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = _handler = None
+
+
+def get_ip(request):
+    http_x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if http_x_forwarded_for:
+        ip = http_x_forwarded_for.split(',')[0]
+    else:
+        ip = request.META.get('REMOTE_ADDR')
+    return ip
+
+
+def audit(event, sample=1.0, **fields):
+    """
+    Log an audit `event` with JSON-serializable `fields`.
+
+    Only a `sample` fraction of calls is logged, which keeps high-volume
+    events cheap.
+    """
+    if sample < 1.0 and random.random() >= sample:
+        return
+    if _listener is None:
+        start()
+    logger.info(event, extra={'audit': fields})
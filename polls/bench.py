@@ -0,0 +1,132 @@
+"""Seed a polls database and measure its hot pages through the test client."""
+import datetime
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Choice, Question, Vote
+
+CHUNK = 10000
+
+
+def seed(questions, choices, votes, seed=0):
+    """
+    Create `questions` open questions with `choices` choices and `votes` votes.
+
+    Enough users are created for every vote to come from a different
+    (user, question) pair. Return the ids of the questions and the users.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    question_ids = [
+        question.pk for question in Question.objects.bulk_create(
+            Question(
+                question_text=f"Bench question {number}",
+                pub_date=now - datetime.timedelta(days=1, minutes=number),
+                end_date=now + datetime.timedelta(days=30),
+            )
+            for number in range(questions)
+        )
+    ]
+    choice_ids = {question_id: [] for question_id in question_ids}
+    for choice in Choice.objects.bulk_create(
+        Choice(question_id=question_id, choice_text=f"Choice {number}")
+        for question_id in question_ids for number in range(choices)
+    ):
+        choice_ids[choice.question_id].append(choice.pk)
+    users = -(-votes // questions)
+    user_ids = []
+    for start in range(0, users, CHUNK):
+        user_ids += [user.pk for user in User.objects.bulk_create(
+            User(username=f"bench{number}") for number in range(start, min(start + CHUNK, users))
+        )]
+    tallies = Counter()
+    batch = []
+    for number in range(votes):
+        user_id, question_id = user_ids[number // questions], question_ids[number % questions]
+        choice_id = rng.choice(choice_ids[question_id])
+        tallies[choice_id] += 1
+        batch.append(Vote(user_id=user_id, question_id=question_id, choice_id=choice_id))
+        if len(batch) == CHUNK:
+            Vote.objects.bulk_create(batch)
+            batch = []
+    Vote.objects.bulk_create(batch)
+    with transaction.atomic():
+        for choice_id, count in tallies.items():
+            Choice.objects.filter(pk=choice_id).update(votes=count)
+    return question_ids, user_ids
+
+
+def summarize(latencies, errors, elapsed):
+    """Return throughput and latency percentiles of a run, in requests per second and ms."""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def run(requests, workers, make_request):
+    """Call make_request(client, rng, worker) `requests` times over `workers` threads."""
+    def worker(number):
+        client = Client(raise_request_exception=False)
+        rng = random.Random(number)
+        latencies, errors = [], 0
+        try:
+            for _ in range(requests // workers + (number < requests % workers)):
+                start = time.perf_counter()
+                response = make_request(client, rng, number)
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code >= 400
+        finally:
+            connection.close()
+        return latencies, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        parts = list(pool.map(worker, range(workers)))
+    elapsed = time.perf_counter() - start
+    return summarize([latency for latencies, _ in parts for latency in latencies], sum(e for _, e in parts), elapsed)
+
+
+def measure(question_ids, user_ids, requests, workers):
+    """Measure the index, detail, results and vote pages. Reads use one worker."""
+    choice_ids = {}
+    for choice_id, question_id in Choice.objects.filter(question_id__in=question_ids).values_list('pk', 'question_id'):
+        choice_ids.setdefault(question_id, []).append(choice_id)
+    voters = User.objects.filter(pk__in=user_ids[:workers]).order_by('pk')
+    logged_in = {}
+
+    def index(client, rng, worker):
+        return client.get(reverse('polls:index'))
+
+    def detail(client, rng, worker):
+        return client.get(reverse('polls:detail', args=(rng.choice(question_ids),)))
+
+    def results(client, rng, worker):
+        return client.get(reverse('polls:results', args=(rng.choice(question_ids),)))
+
+    def vote(client, rng, worker):
+        if worker not in logged_in:
+            client.force_login(voters[worker])
+            logged_in[worker] = True
+        question_id = rng.choice(question_ids)
+        return client.post(reverse('polls:vote', args=(question_id,)), {'choice': rng.choice(choice_ids[question_id])})
+
+    return {
+        'index': run(requests, 1, index),
+        'detail': run(requests, 1, detail),
+        'results': run(requests, 1, results),
+        'vote': run(requests, workers, vote),
+    }
@@ -0,0 +1,90 @@
+"""Tell open results streams that a question got a new vote."""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """A listener for vote notifications on one question."""
+
+    def __init__(self, broker, question_id):
+        """Create a subscription bound to the running event loop."""
+        self.broker = broker
+        self.question_id = question_id
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def notify(self):
+        """Wake the listener. Safe to call from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            # The listener's event loop has already closed.
+            self.close()
+
+    async def wait(self, timeout):
+        """Wait until notified or `timeout` seconds pass. Return True if notified."""
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.event.clear()
+        return True
+
+    def close(self):
+        """Stop listening."""
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """
+    Pub/sub inside one process.
+
+    Notifications carry no data, so many votes between two reads of a
+    subscription collapse into one wake up. Deployments with several
+    processes point POLLS_BROKER at a class with the same methods that
+    relays notifications between them.
+    """
+
+    def __init__(self):
+        """Create a broker with no subscribers."""
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+
+    def subscribe(self, question_id):
+        """Return a new Subscription to votes on `question_id`."""
+        subscription = Subscription(self, question_id)
+        with self.lock:
+            self.subscribers[question_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Forget `subscription`."""
+        with self.lock:
+            listeners = self.subscribers.get(subscription.question_id, set())
+            listeners.discard(subscription)
+            if not listeners:
+                self.subscribers.pop(subscription.question_id, None)
+
+    def publish(self, question_id):
+        """Notify every subscriber of `question_id`."""
+        with self.lock:
+            listeners = list(self.subscribers.get(question_id, ()))
+        for subscription in listeners:
+            subscription.notify()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process wide broker, built from the POLLS_BROKER setting."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.POLLS_BROKER)()
+        return _broker
@@ -0,0 +1,161 @@
+"""Cache question results, keyed by a version number bumped on every vote."""
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Choice, Question
+from .stats import SharedCounters
+from .tally import get_tally_engine
+
+HITS_KEY = 'polls:results:hits'
+MISSES_KEY = 'polls:results:misses'
+
+
+def get_cache():
+    """Return the cache that stores results, chosen by POLLS_RESULTS_CACHE."""
+    return caches[settings.POLLS_RESULTS_CACHE]
+
+
+def version_key(question_id):
+    """Return the cache key of a question's results version."""
+    return f'polls:results:version:{question_id}'
+
+
+def first_version():
+    """
+    Return a starting version number.
+
+    It comes from the clock so a version evicted from the cache never
+    starts over at a number that was already handed out.
+    """
+    return time.time_ns() // 1000
+
+
+def results_version(question_id):
+    """Return the current results version of a question."""
+    cache = get_cache()
+    version = cache.get(version_key(question_id))
+    if version is None:
+        cache.add(version_key(question_id), first_version(), timeout=None)
+        version = cache.get(version_key(question_id))
+    return version
+
+
+def question_dates(question_id, version):
+    """
+    Return the (pub_date, end_date) of a question, or None if it does not exist.
+
+    Stored under the results version, which saving a question bumps.
+    """
+    cache = get_cache()
+    key = f'polls:question:dates:{question_id}:v{version}'
+    dates = cache.get(key)
+    if dates is None:
+        dates = Question.objects.filter(pk=question_id).values_list('pub_date', 'end_date').first()
+        if dates is not None:
+            cache.set(key, dates, timeout=results_timeout())
+    return dates
+
+
+def bump_results_version(question_id):
+    """Make every cached result of a question stale."""
+    cache = get_cache()
+    try:
+        cache.incr(version_key(question_id))
+    except ValueError:
+        cache.add(version_key(question_id), first_version(), timeout=None)
+
+
+def is_shared(cache):
+    """Return True if every process sees the same entries in `cache`."""
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def results_timeout():
+    """
+    Return how long cached results may live.
+
+    A process-local cache only learns of the votes taken by its own
+    process, so there results live for POLLS_RESULTS_LOCAL_TIMEOUT seconds.
+    """
+    if is_shared(get_cache()):
+        return settings.POLLS_RESULTS_CACHE_TIMEOUT
+    return min(settings.POLLS_RESULTS_CACHE_TIMEOUT, settings.POLLS_RESULTS_LOCAL_TIMEOUT)
+
+
+class Counters:
+    """Hit and miss counts of this process, added to the shared counters every so often."""
+
+    def __init__(self):
+        """Start at zero."""
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.flushed = time.monotonic()
+
+    def add(self, key):
+        """Count one hit or miss and flush if POLLS_STATS_FLUSH_INTERVAL has passed."""
+        with self.lock:
+            self.counts[key] += 1
+            due = time.monotonic() - self.flushed >= settings.POLLS_STATS_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Add the local counts to the shared ones and start over."""
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            self.flushed = time.monotonic()
+        if counts:
+            shared_counters.add(counts)
+
+
+shared_counters = SharedCounters('results')
+counters = Counters()
+
+
+def get_results(question_id):
+    """
+    Return the choices of a question as a list of dicts with their vote counts.
+
+    The list is read from the cache when the question has not been voted on
+    since it was stored. With POLLS_TALLY_ENGINE on, those of open questions
+    come from memory.
+    """
+    if settings.POLLS_TALLY_ENGINE:
+        results = get_tally_engine().results(question_id)
+        if results is not None:
+            return results
+    cache = get_cache()
+    key = f'polls:results:{question_id}:v{results_version(question_id)}'
+    results = cache.get(key)
+    if results is None:
+        counters.add(MISSES_KEY)
+        # Read from the primary: a lagging replica would cache old counts under the new version.
+        results = list(
+            Choice.objects.using(DEFAULT_DB_ALIAS).filter(question_id=question_id).order_by('pk').values(
+                'id', 'choice_text', 'votes'
+            )
+        )
+        cache.set(key, results, timeout=results_timeout())
+    else:
+        counters.add(HITS_KEY)
+    return results
+
+
+def stats():
+    """Return the hit and miss counters of every process as a dict."""
+    counters.flush()
+    totals = shared_counters.read()
+    return {'hits': totals[HITS_KEY], 'misses': totals[MISSES_KEY]}
+
+
+def reset_stats():
+    """Set the hit and miss counters back to zero."""
+    counters.flush()
+    shared_counters.reset()
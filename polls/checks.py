@@ -0,0 +1,22 @@
+"""System checks for the polls settings."""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.checks import Error, Tags, register
+
+from .cache import is_shared
+
+
+@register(Tags.caches)
+def check_shared_session_cache(app_configs, **kwargs):
+    """Refuse cached_db sessions in a process-local cache, where a logout only reaches one process."""
+    if settings.SESSION_ENGINE != 'django.contrib.sessions.backends.cached_db':
+        return []
+    alias = settings.SESSION_CACHE_ALIAS
+    if is_shared(caches[alias]):
+        return []
+    return [Error(
+        f"SESSION_PROFILE is 'cached_db' but SESSION_CACHE_ALIAS is the process-local cache '{alias}', "
+        "so a logout leaves the session live in every other process.",
+        hint="Set POLLS_SESSION_CACHE to a cache shared by every process, such as the file-based 'sessions' alias.",
+        id='polls.E003',
+    )]
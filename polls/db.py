@@ -0,0 +1,25 @@
+"""Tune new database connections."""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Run the POLLS_SQLITE_PRAGMAS on every new SQLite connection."""
+    if connection.vendor != 'sqlite' or not settings.POLLS_SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.POLLS_SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def install_query_timing(sender, connection, **kwargs):
+    """Count queries for TimingMiddleware when POLLS_TIMING is on."""
+    if not settings.POLLS_TIMING:
+        return
+    # Imported here so processes without timing never load polls.timing.
+    from .timing import record_query
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,165 @@
+"""Queue votes in memory and write them to the database in batches."""
+import atexit
+import logging
+import math
+import queue
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Case, F, Value, When
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .broker import get_broker
+from .cache import bump_results_version
+from .models import Choice, Vote, VoteBucket
+
+logger = logging.getLogger('polls')
+
+
+def apply_votes(items):
+    """
+    Write a batch of (user_id, question_id, choice_id) votes in one transaction.
+
+    A later vote of the same user in the same question replaces an earlier
+    one. Return the ids of the questions whose results changed.
+    """
+    latest = {}
+    for user_id, question_id, choice_id in items:
+        latest[user_id, question_id] = choice_id
+    with transaction.atomic():
+        now = timezone.now()
+        existing = {
+            (vote.user_id, vote.question_id): vote
+            for vote in Vote.objects.select_for_update().filter(
+                user_id__in={user_id for user_id, _ in latest},
+                question_id__in={question_id for _, question_id in latest},
+            )
+        }
+        new, changed, deltas, touched = [], [], Counter(), set()
+        for (user_id, question_id), choice_id in latest.items():
+            vote = existing.get((user_id, question_id))
+            if vote is None:
+                new.append(Vote(user_id=user_id, question_id=question_id, choice_id=choice_id, voted_at=now))
+            elif vote.choice_id != choice_id:
+                deltas[question_id, vote.choice_id] -= 1
+                vote.choice_id = choice_id
+                vote.voted_at = now
+                changed.append(vote)
+            else:
+                continue
+            deltas[question_id, choice_id] += 1
+            touched.add(question_id)
+        Vote.objects.bulk_create(new)
+        Vote.objects.bulk_update(changed, ['choice', 'voted_at'])
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if deltas:
+            # With the tally engine on, the view already counted these votes in memory.
+            if not settings.POLLS_TALLY_ENGINE:
+                Choice.objects.filter(pk__in=[choice_id for _, choice_id in deltas]).update(votes=F('votes') + Case(
+                    *(When(pk=choice_id, then=Value(delta)) for (_, choice_id), delta in deltas.items()),
+                    default=Value(0),
+                ))
+            VoteBucket.objects.add(deltas, now)
+    for question_id in touched:
+        bump_results_version(question_id)
+        get_broker().publish(question_id)
+    return touched
+
+
+def queue_full():
+    """
+    Return a 503 response asking the client to retry after the next flush.
+
+    A vote that does not fit in the queue is refused rather than written
+    directly, so an older vote of the same user still queued cannot
+    overwrite it when its batch is written.
+    """
+    response = HttpResponse("Too many votes are waiting to be written. Please try again.", status=503)
+    response['Retry-After'] = str(max(1, math.ceil(settings.POLLS_VOTE_FLUSH_INTERVAL)))
+    return response
+
+
+class VoteQueue:
+    """A bounded queue of votes drained by a background thread."""
+
+    def __init__(self, maxsize, batch_size, flush_interval):
+        """Create the queue and start its flusher thread."""
+        self.queue = queue.Queue(maxsize)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='polls-vote-flusher', daemon=True)
+        self.thread.start()
+
+    def submit(self, user_id, question_id, choice_id):
+        """Queue a vote. Return False if the queue is full or shutting down."""
+        if self.stopping.is_set():
+            return False
+        try:
+            self.queue.put_nowait((user_id, question_id, choice_id))
+        except queue.Full:
+            return False
+        return True
+
+    def take_batch(self):
+        """Wait for a vote, then collect more until the batch is full or the interval ends."""
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self, batch):
+        """Write a batch, falling back to one vote at a time if the batch fails."""
+        close_old_connections()
+        try:
+            apply_votes(batch)
+        except Exception:
+            logger.exception("Batch of %d votes failed, writing them one by one.", len(batch))
+            for item in batch:
+                try:
+                    apply_votes([item])
+                except Exception:
+                    logger.exception("Dropped vote %s.", item)
+
+    def run(self):
+        """Write batches until stopped and the queue is empty."""
+        while not (self.stopping.is_set() and self.queue.empty()):
+            batch = self.take_batch()
+            if batch:
+                self.flush(batch)
+        connection.close()
+
+    def stop(self):
+        """Refuse new votes and wait until every queued vote is written."""
+        self.stopping.set()
+        self.thread.join()
+
+
+_vote_queue = None
+_vote_queue_lock = threading.Lock()
+
+
+def get_vote_queue():
+    """Return the process wide vote queue, built from the POLLS_VOTE_QUEUE_* settings."""
+    global _vote_queue
+    with _vote_queue_lock:
+        if _vote_queue is None:
+            _vote_queue = VoteQueue(
+                settings.POLLS_VOTE_QUEUE_SIZE,
+                settings.POLLS_VOTE_BATCH_SIZE,
+                settings.POLLS_VOTE_FLUSH_INTERVAL,
+            )
+            atexit.register(_vote_queue.stop)
+        return _vote_queue
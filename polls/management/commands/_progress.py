@@ -0,0 +1,30 @@
+"""Progress reporting shared by the bulk import and export commands."""
+import time
+
+
+class Progress:
+    """Count rows and report them with a rows per second rate."""
+
+    def __init__(self, stream, label, every):
+        """Report to `stream` every `every` rows."""
+        self.stream = stream
+        self.label = label
+        self.every = every
+        self.rows = 0
+        self.start = time.perf_counter()
+
+    def add(self, rows):
+        """Count `rows` more rows, reporting whenever another `every` rows are done."""
+        before = self.rows // self.every
+        self.rows += rows
+        if self.rows // self.every != before:
+            self.report()
+
+    def rate(self):
+        """Return rows per second so far."""
+        elapsed = time.perf_counter() - self.start
+        return self.rows / elapsed if elapsed else 0.0
+
+    def report(self):
+        """Write the current count and rate."""
+        self.stream.write(f"{self.label}: {self.rows} rows, {self.rate():.0f} rows/s")
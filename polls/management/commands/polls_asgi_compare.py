@@ -0,0 +1,61 @@
+"""Compare the polls pages served through the WSGI and the ASGI handler."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from polls.models import Question
+
+
+class Command(BaseCommand):
+    """Send the same load to a polls page through both handlers and print requests per second."""
+
+    help = "Load test a polls page through the WSGI and ASGI handlers in-process."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--question', type=int, help="Question id to load. Defaults to the newest question.")
+        parser.add_argument('--view', choices=['results', 'detail'], default='results')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=50)
+
+    def handle(self, *args, **options):
+        question = options['question'] or Question.objects.order_by('-pk').values_list('pk', flat=True).first()
+        if question is None:
+            raise CommandError("No question to load. Create one or pass --question.")
+        path = reverse(f"polls:{options['view']}", args=(question,))
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for name, run in (('wsgi', self.run_wsgi), ('asgi', self.run_asgi)):
+                start = time.perf_counter()
+                statuses = run(path, options['requests'], options['concurrency'])
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{name}: {options['requests'] / elapsed:.1f} req/s "
+                    f"({elapsed:.2f}s, statuses {sorted(set(statuses))})"
+                )
+
+    def run_wsgi(self, path, requests, concurrency):
+        """Send `requests` GETs from `concurrency` threads, one test client each."""
+        def worker(count):
+            client = Client()
+            return [client.get(path).status_code for _ in range(count)]
+
+        shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        with ThreadPoolExecutor(concurrency) as pool:
+            return [status for statuses in pool.map(worker, shares) for status in statuses]
+
+    def run_asgi(self, path, requests, concurrency):
+        """Send `requests` GETs with at most `concurrency` in flight on one event loop."""
+        async def main():
+            client = AsyncClient()
+            limit = asyncio.Semaphore(concurrency)
+
+            async def fetch():
+                async with limit:
+                    return (await client.get(path)).status_code
+
+            return await asyncio.gather(*(fetch() for _ in range(requests)))
+
+        return asyncio.run(main())
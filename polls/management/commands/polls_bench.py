@@ -0,0 +1,71 @@
+"""Benchmark the polls hot pages on a seeded throwaway database."""
+import json
+import platform
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from polls import bench
+from polls.models import Question
+
+
+class Command(BaseCommand):
+    """
+    Seed a test database, measure the index, detail, results and vote pages and write JSON.
+
+    The configured database is never touched; a test database is created
+    next to it (a bench file for SQLite) and dropped afterwards unless
+    --keepdb is given.
+    """
+
+    help = "Seed a throwaway database and benchmark the polls pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=100)
+        parser.add_argument('--choices', type=int, default=4)
+        parser.add_argument('--votes', type=int, default=10 ** 4, help="From 10**3 up to 10**7.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per page.")
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent voters.")
+        parser.add_argument('--output', default='polls_bench.json')
+        parser.add_argument('--keepdb', action='store_true', help="Keep and reuse the seeded database.")
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = str(settings.BASE_DIR / 'polls_bench.sqlite3')
+        original_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            if options['keepdb'] and Question.objects.exists():
+                self.stderr.write("Reusing seeded database.")
+                question_ids = list(Question.objects.values_list('pk', flat=True))
+                user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True)[:options['workers']])
+            else:
+                self.stderr.write(f"Seeding {options['votes']} votes...")
+                question_ids, user_ids = bench.seed(options['questions'], options['choices'], options['votes'])
+            with override_settings(
+                ALLOWED_HOSTS=['testserver'], POLLS_PAGE_CACHE=False, POLLS_VOTE_USER_RATE=0, POLLS_VOTE_IP_RATE=0,
+            ):
+                results = bench.measure(question_ids, user_ids, options['requests'], options['workers'])
+        finally:
+            connection.creation.destroy_test_db(original_name, verbosity=0, keepdb=options['keepdb'])
+        report = {
+            'date': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'config': {key: options[key] for key in ('questions', 'choices', 'votes', 'requests', 'workers')},
+            'results': results,
+        }
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2)
+        for page, numbers in results.items():
+            self.stdout.write(
+                f"{page:<8} {numbers['rps']:8.1f} req/s  p50 {numbers['p50_ms']:7.2f} ms  "
+                f"p99 {numbers['p99_ms']:7.2f} ms  errors {numbers['errors']}"
+            )
+        self.stdout.write(f"Wrote {options['output']}")
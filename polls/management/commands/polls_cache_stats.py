@@ -0,0 +1,27 @@
+"""Show how often poll results were served from the cache."""
+from django.core.management.base import BaseCommand
+
+from polls import cache
+
+
+class Command(BaseCommand):
+    """Print the results cache hit and miss counters."""
+
+    help = (
+        "Print the results cache hit and miss counters of every process. Each "
+        "process writes its counts to its own file in POLLS_STATS_DIR every "
+        "POLLS_STATS_FLUSH_INTERVAL seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Set the counters back to zero afterwards.")
+
+    def handle(self, *args, **options):
+        counters = cache.stats()
+        lookups = counters['hits'] + counters['misses']
+        ratio = counters['hits'] / lookups if lookups else 0
+        self.stdout.write(f"hits: {counters['hits']}")
+        self.stdout.write(f"misses: {counters['misses']}")
+        self.stdout.write(f"hit ratio: {ratio:.1%}")
+        if options['reset']:
+            cache.reset_stats()
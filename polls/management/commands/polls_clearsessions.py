@@ -0,0 +1,41 @@
+"""Delete expired sessions a batch at a time."""
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DatabaseSessionStore
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """Delete expired sessions in short transactions so votes are not held up."""
+
+    help = (
+        "Delete expired sessions from the session table in batches. Unlike "
+        "clearsessions, no single DELETE holds the SQLite write lock for long."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not issubclass(store, DatabaseSessionStore):
+            self.stdout.write(f"{settings.SESSION_ENGINE} keeps no sessions in the database, nothing to delete.")
+            return
+        session_model = store.get_model_class()
+        now = timezone.now()
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                expired = list(
+                    session_model.objects.filter(expire_date__lt=now).values_list('pk', flat=True)[:options['batch_size']]
+                )
+                if not expired:
+                    break
+                deleted += session_model.objects.filter(pk__in=expired).delete()[0]
+            time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired session(s)."))
@@ -0,0 +1,54 @@
+"""Print the database query plan of each hot polls query."""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from polls.models import Choice, Question, Vote
+
+
+def hot_queries():
+    """Return the queries the polls pages run on every request, by name."""
+    now = timezone.now()
+    return {
+        'index': Question.objects.filter(pub_date__lte=now).order_by('-pub_date'),
+        'open questions': Question.objects.open(now),
+        'choices of question': Choice.objects.filter(question_id=1),
+        'vote of user': Vote.objects.filter(user_id=1, question_id=1).values_list('choice_id', flat=True),
+        'votes per choice': Vote.objects.filter(question_id=1).values('choice').annotate(total=Count('id')),
+    }
+
+
+def is_table_scan(line):
+    """Return True if a plan line reads a whole table without an index."""
+    if connection.vendor == 'sqlite':
+        return 'SCAN' in line and 'USING' not in line
+    return 'Seq Scan' in line
+
+
+class Command(BaseCommand):
+    """Show EXPLAIN output for the hot queries and flag full table scans."""
+
+    help = "Print EXPLAIN output for the polls hot queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-scan', action='store_true',
+            help="Exit with status 1 if any query reads a whole table. "
+                 "Run against a database with realistic data, since small tables "
+                 "may be scanned on purpose by the planner.",
+        )
+
+    def handle(self, *args, **options):
+        scans = []
+        for name, queryset in hot_queries().items():
+            plan = queryset.explain()
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            if any(is_table_scan(line) for line in plan.splitlines()):
+                scans.append(name)
+        if scans:
+            message = f"Table scan in: {', '.join(scans)}"
+            if options['fail_on_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
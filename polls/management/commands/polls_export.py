@@ -0,0 +1,75 @@
+"""Write questions or votes to a JSONL or CSV file."""
+import csv
+import json
+
+from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
+
+from polls.models import Choice, Question, Vote
+
+from ._progress import Progress
+
+VOTE_FIELDS = ['id', 'user', 'question', 'choice', 'voted_at']
+QUESTION_FIELDS = ['question_text', 'pub_date', 'end_date', 'choices']
+
+
+class Command(BaseCommand):
+    """Stream rows out with a database cursor so memory stays flat."""
+
+    help = "Export questions or votes as JSONL or CSV ('-' for stdout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=['questions', 'votes'])
+        parser.add_argument('path', nargs='?', default='-')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        rows = self.vote_rows if options['model'] == 'votes' else self.question_rows
+        fields = VOTE_FIELDS if options['model'] == 'votes' else QUESTION_FIELDS
+        progress = Progress(self.stderr, options['model'], options['chunk_size'])
+        if path == '-':
+            stream = self.stdout
+            stream.ending = ''
+        else:
+            stream = open(path, 'w', newline='', encoding='utf-8')
+        try:
+            if file_format == 'csv':
+                writer = csv.writer(stream)
+                writer.writerow(fields)
+                for row in rows(options['chunk_size']):
+                    if options['model'] == 'questions':
+                        row = {**row, 'choices': '|'.join(row['choices'])}
+                    writer.writerow(row[field] for field in fields)
+                    progress.add(1)
+            else:
+                for row in rows(options['chunk_size']):
+                    stream.write(json.dumps(row) + '\n')
+                    progress.add(1)
+        finally:
+            if stream is not self.stdout:
+                stream.close()
+        progress.report()
+
+    def vote_rows(self, chunk_size):
+        """Yield every vote as a dict, fetched `chunk_size` rows at a time."""
+        votes = Vote.objects.order_by('pk').values_list(
+            'pk', 'user__username', 'question_id', 'choice_id', 'voted_at'
+        )
+        for *row, voted_at in votes.iterator(chunk_size=chunk_size):
+            yield dict(zip(VOTE_FIELDS, [*row, voted_at.isoformat()]))
+
+    def question_rows(self, chunk_size):
+        """Yield every question with its choice texts, fetched `chunk_size` rows at a time."""
+        questions = Question.objects.order_by('pk').prefetch_related(
+            Prefetch('choice_set', queryset=Choice.objects.order_by('pk'))
+        )
+        for question in questions.iterator(chunk_size=chunk_size):
+            yield {
+                'question_text': question.question_text,
+                'pub_date': question.pub_date.isoformat(),
+                'end_date': question.end_date.isoformat(),
+                'choices': [choice.choice_text for choice in question.choice_set.all()],
+            }
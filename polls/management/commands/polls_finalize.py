@@ -0,0 +1,91 @@
+"""Freeze the results of closed questions and move their votes out of the Vote table."""
+import gzip
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from polls.cache import bump_results_version
+from polls.models import ArchivedVote, Choice, Question, ResultSnapshot, Vote
+
+
+class Command(BaseCommand):
+    """Write a ResultSnapshot for every closed question that has none yet."""
+
+    help = (
+        "Snapshot the final results of questions past their end date. With "
+        "--archive, their Vote rows are then moved to the ArchivedVote table or "
+        "to a gzipped JSONL file per question. Safe to run from cron: finalized "
+        "questions are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archive', choices=['none', 'table', 'file'], default='none')
+        parser.add_argument(
+            '--archive-dir', default=settings.POLLS_ARCHIVE_DIR,
+            help="Directory of the --archive file output. Defaults to POLLS_ARCHIVE_DIR.",
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        questions = Question.objects.closed(timezone.now()).filter(snapshot__isnull=True).order_by('pk')
+        finalized = 0
+        for question in questions:
+            with transaction.atomic():
+                snapshot = self.snapshot(question)
+                if options['archive'] == 'table':
+                    self.archive_to_table(question, options['chunk_size'])
+                elif options['archive'] == 'file':
+                    self.archive_to_file(question, Path(options['archive_dir']), options['chunk_size'])
+                if options['archive'] != 'none':
+                    Vote.objects.filter(question=question).delete()
+                    snapshot.archived = options['archive']
+                    snapshot.save(update_fields=['archived'])
+            bump_results_version(question.pk)
+            finalized += 1
+            self.stdout.write(f"Question {question.pk} ({question}): {snapshot.total} votes")
+        self.stdout.write(self.style.SUCCESS(f"Finalized {finalized} question(s)."))
+
+    def snapshot(self, question):
+        """Count the question's Vote rows, store them as its snapshot and fix its counters."""
+        choices = list(
+            Choice.objects.filter(question=question).order_by('pk').annotate(num_votes=Count('vote'))
+        )
+        for choice in choices:
+            choice.votes = choice.num_votes
+        Choice.objects.bulk_update(choices, ['votes'])
+        return ResultSnapshot.objects.create(
+            question=question,
+            choices=[{'id': c.pk, 'choice_text': c.choice_text, 'votes': c.votes} for c in choices],
+            total=sum(choice.votes for choice in choices),
+        )
+
+    def votes(self, question, chunk_size):
+        """Yield the question's votes as tuples, `chunk_size` rows at a time."""
+        rows = Vote.objects.filter(question=question).order_by('pk').values_list(
+            'user_id', 'choice_id', 'voted_at'
+        )
+        return rows.iterator(chunk_size=chunk_size)
+
+    def archive_to_table(self, question, chunk_size):
+        """Copy the question's votes into ArchivedVote."""
+        batch = []
+        for user_id, choice_id, voted_at in self.votes(question, chunk_size):
+            batch.append(ArchivedVote(user_id=user_id, question=question, choice_id=choice_id, voted_at=voted_at))
+            if len(batch) == chunk_size:
+                ArchivedVote.objects.bulk_create(batch)
+                batch = []
+        ArchivedVote.objects.bulk_create(batch)
+
+    def archive_to_file(self, question, directory, chunk_size):
+        """Write the question's votes to question-<pk>.jsonl.gz in `directory`."""
+        directory.mkdir(parents=True, exist_ok=True)
+        with gzip.open(directory / f'question-{question.pk}.jsonl.gz', 'wt', encoding='utf-8') as archive:
+            for user_id, choice_id, voted_at in self.votes(question, chunk_size):
+                archive.write(json.dumps({
+                    'user': user_id, 'question': question.pk, 'choice': choice_id, 'voted_at': voted_at.isoformat(),
+                }) + '\n')
@@ -0,0 +1,107 @@
+"""Load questions and their choices from a JSONL or CSV file."""
+import csv
+import json
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from polls.models import Choice, Question
+
+from ._progress import Progress
+
+
+def parse_date(value):
+    """Parse an ISO 8601 date, treating naive dates as the current time zone."""
+    try:
+        date = parse_datetime(value)
+    except (TypeError, ValueError):
+        date = None
+    if date is None:
+        raise CommandError(f"Invalid date: {value!r}")
+    return timezone.make_aware(date) if timezone.is_naive(date) else date
+
+
+def read_jsonl(stream):
+    """Yield (line number, question dict) from JSON lines."""
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise CommandError(f"Line {number}: invalid JSON: {exc}")
+        if not isinstance(record, dict):
+            raise CommandError(f"Line {number}: expected a JSON object.")
+        yield number, record
+
+
+def read_csv(stream):
+    """Yield (line number, question dict) from CSV rows whose choices are joined by '|'."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        row['choices'] = [choice for choice in (row.get('choices') or '').split('|') if choice]
+        yield reader.line_num, row
+
+
+def build_question(number, record):
+    """Return the unsaved question of a record, or raise CommandError naming its line."""
+    try:
+        return Question(
+            question_text=record['question_text'],
+            pub_date=parse_date(record['pub_date']),
+            end_date=parse_date(record['end_date']),
+        )
+    except KeyError as exc:
+        raise CommandError(f"Line {number}: missing {exc.args[0]!r}.")
+    except CommandError as exc:
+        raise CommandError(f"Line {number}: {exc}")
+
+
+class Command(BaseCommand):
+    """
+    Create questions and choices in chunks of bulk inserts.
+
+    Each record has question_text, pub_date, end_date and a list of choices.
+    The format matches ``polls_export questions``.
+    """
+
+    help = "Import questions and choices from a JSONL or CSV file ('-' for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        reader = read_csv if file_format == 'csv' else read_jsonl
+        progress = Progress(self.stderr, 'questions', options['chunk_size'])
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            records = reader(stream)
+            while True:
+                chunk = list(islice(records, options['chunk_size']))
+                if not chunk:
+                    break
+                self.import_chunk(chunk)
+                progress.add(len(chunk))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        progress.report()
+
+    def import_chunk(self, records):
+        """Create the questions of one chunk of (line number, record), then all of their choices."""
+        questions = [build_question(number, record) for number, record in records]
+        with transaction.atomic():
+            questions = Question.objects.bulk_create(questions)
+            Choice.objects.bulk_create(
+                Choice(question=question, choice_text=choice_text)
+                for question, (_, record) in zip(questions, records)
+                for choice_text in record.get('choices', [])
+            )
@@ -0,0 +1,94 @@
+"""Measure how long a fresh worker takes to import, start and serve its first request."""
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter with -X importtime. Prints the phase timings as
+# JSON on stdout; the import times go to stderr.
+CHILD = '''
+import io, json, os, sys, time
+start = time.perf_counter()
+import django
+from django.conf import settings
+django.setup()
+timings = {"settings loaded, apps ready": time.perf_counter() - start}
+from django.utils.module_loading import import_string
+settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+application = import_string(settings.WSGI_APPLICATION)
+timings["application ready"] = time.perf_counter() - start
+statuses = []
+for name in ("first request", "second request"):
+    begin = time.perf_counter()
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": sys.argv[1], "QUERY_STRING": "",
+        "SERVER_NAME": "testserver", "SERVER_PORT": "80", "HTTP_HOST": "testserver",
+        "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr, "wsgi.url_scheme": "http",
+    }
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b"".join(response)
+    response.close()
+    timings[name] = time.perf_counter() - begin
+print(json.dumps({"timings": timings, "statuses": statuses}))
+'''
+
+
+def parse_importtime(text):
+    """Return {module: (self_us, cumulative_us)} from `python -X importtime` output."""
+    modules = {}
+    for line in text.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules
+
+
+def by_package(modules):
+    """Return the total self time of each top-level package, largest first."""
+    totals = defaultdict(int)
+    for name, (own, _) in modules.items():
+        totals[name.split('.')[0]] += own
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+class Command(BaseCommand):
+    """Start a new interpreter as a worker would and report where its startup time goes."""
+
+    help = (
+        "Start a fresh Python process with the current settings, build the WSGI "
+        "application (including the POLLS_WARMUP step) and serve two GET requests. "
+        "Prints the time of each phase and the slowest imports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/polls/', help="Path of the requests to serve.")
+        parser.add_argument('--limit', type=int, default=15, help="Number of modules and packages to list.")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'mysite.settings'))
+        child = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD, options['path']],
+            capture_output=True, text=True, env=env,
+        )
+        if child.returncode:
+            raise CommandError(f"Worker failed to start:\n{child.stderr[-2000:]}")
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        modules = parse_importtime(child.stderr)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Startup (since interpreter start) and requests (each)"))
+        for name, seconds in result['timings'].items():
+            self.stdout.write(f"{name}: {seconds * 1000:.1f} ms")
+        self.stdout.write(f"statuses: {', '.join(result['statuses'])}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Import time by package (self)"))
+        for name, own in by_package(modules)[:options['limit']]:
+            self.stdout.write(f"{own / 1000:8.1f} ms  {name}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Slowest modules (self)"))
+        slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (own, cumulative) in slowest[:options['limit']]:
+            self.stdout.write(f"{own / 1000:8.1f} ms  {name} ({cumulative / 1000:.1f} ms with imports)")
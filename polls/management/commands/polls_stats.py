@@ -0,0 +1,34 @@
+"""Show the per-view timing collected by TimingMiddleware."""
+from django.core.management.base import BaseCommand
+
+from polls import timing
+
+
+class Command(BaseCommand):
+    """Print request count, mean, p50 and p99 of each metric per URL name."""
+
+    help = (
+        "Print the request timing histograms of every process. Each process "
+        "writes its numbers to its own file in POLLS_STATS_DIR every "
+        "POLLS_TIMING_FLUSH_INTERVAL seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Delete the histograms afterwards.")
+
+    def handle(self, *args, **options):
+        timing.recorder.flush()
+        stats = timing.read_stats()
+        if not stats:
+            self.stdout.write("No requests recorded.")
+        for url_name, metrics in sorted(stats.items()):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{url_name} ({metrics['wall_ms']['count']} requests)"))
+            for metric, histogram in metrics.items():
+                mean = histogram['total'] / histogram['count'] if histogram['count'] else 0
+                self.stdout.write(
+                    f"  {metric:<12} mean {mean:8.1f}  "
+                    f"p50 <= {timing.percentile(histogram, 0.5):<6}  "
+                    f"p99 <= {timing.percentile(histogram, 0.99)}"
+                )
+        if options['reset']:
+            timing.reset_stats()
@@ -0,0 +1,37 @@
+"""Copy the primary SQLite database over its replica files."""
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    """Refresh every SQLite replica in POLLS_READ_REPLICAS from the primary."""
+
+    help = (
+        "Copy the default SQLite database into each replica file with SQLite's "
+        "online backup, which gives a consistent copy while votes are being "
+        "written. Run it periodically to stand in for replication locally."
+    )
+
+    def handle(self, *args, **options):
+        if not settings.POLLS_READ_REPLICAS:
+            raise CommandError("No replicas configured. Set DB_REPLICAS to a comma separated list of files.")
+        primary = connections['default'].settings_dict
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("Only SQLite databases can be copied.")
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias in settings.POLLS_READ_REPLICAS:
+                connections[alias].close()
+                start = time.perf_counter()
+                target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f"{alias}: {(time.perf_counter() - start) * 1000:.0f} ms")
+        finally:
+            source.close()
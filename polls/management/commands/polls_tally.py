@@ -0,0 +1,38 @@
+"""Rebuild the Choice.votes counters from Vote rows."""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from polls.models import Choice
+
+
+class Command(BaseCommand):
+    """Compare every choice's vote counter with its Vote rows and fix drift."""
+
+    help = "Rebuild Choice.votes from Vote rows and report any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report drift, do not write. Exits with status 1 if any is found.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = []
+            # Questions whose votes were archived by polls_finalize keep their counters.
+            choices = Choice.objects.exclude(question__snapshot__archived__gt='').annotate(num_votes=Count('vote'))
+            for choice in choices:
+                if choice.votes != choice.num_votes:
+                    self.stdout.write(
+                        f"Choice {choice.pk} ({choice}): counter={choice.votes} actual={choice.num_votes}"
+                    )
+                    choice.votes = choice.num_votes
+                    drifted.append(choice)
+            if options['check']:
+                if drifted:
+                    raise CommandError(f"{len(drifted)} choice(s) drifted.")
+                self.stdout.write(self.style.SUCCESS("All tallies match."))
+                return
+            Choice.objects.bulk_update(drifted, ['votes'], batch_size=500)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt tallies, {len(drifted)} choice(s) fixed."))
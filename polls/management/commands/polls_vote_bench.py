@@ -0,0 +1,58 @@
+"""Measure how many votes per second the database absorbs."""
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+from django.utils import timezone
+
+from polls.models import Question, Vote
+
+
+class Command(BaseCommand):
+    """
+    Cast votes from several threads against the configured database.
+
+    Run it once per DB_PROFILE to compare, e.g.
+    ``DB_PROFILE=sqlite-production python manage.py polls_vote_bench``.
+    """
+
+    help = "Cast votes from several threads and print votes per second."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--votes', type=int, default=2000)
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        question = Question.objects.create(
+            question_text="polls_vote_bench",
+            pub_date=timezone.now(),
+            end_date=timezone.now() + datetime.timedelta(hours=1),
+        )
+        choices = [question.choice_set.create(choice_text=str(number)) for number in range(4)]
+        users = User.objects.bulk_create(
+            User(username=f"polls_vote_bench_{number}") for number in range(options['votes'])
+        )
+        errors = []
+
+        def cast(number):
+            try:
+                Vote.objects.cast(users[number], question, choices[number % len(choices)])
+            except OperationalError as error:
+                errors.append(error)
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(options['threads']) as pool:
+                list(pool.map(cast, range(len(users))))
+            elapsed = time.perf_counter() - start
+        finally:
+            question.delete()
+            User.objects.filter(username__startswith="polls_vote_bench_").delete()
+        self.stdout.write(f"profile: {settings.DB_PROFILE}")
+        self.stdout.write(f"votes: {len(users) - len(errors)} in {elapsed:.2f}s")
+        self.stdout.write(f"votes/s: {(len(users) - len(errors)) / elapsed:.1f}")
+        self.stdout.write(f"errors: {len(errors)}")
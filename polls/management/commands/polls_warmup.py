@@ -0,0 +1,25 @@
+"""Compile the polls templates and check the URLconf."""
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateSyntaxError
+
+from polls.warmup import warm_up
+
+
+class Command(BaseCommand):
+    """Run the worker warm-up and print how long each step took."""
+
+    help = (
+        "Compile polls/*.html and registration/*.html and load the URLconf, as "
+        "each worker does on start when POLLS_WARMUP is on. Fails on a broken "
+        "template or URL pattern, so it can gate a deploy."
+    )
+
+    def handle(self, *args, **options):
+        try:
+            timings = warm_up()
+        except (ImproperlyConfigured, TemplateSyntaxError) as error:
+            raise CommandError(error)
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name}: {seconds * 1000:.1f} ms")
+        self.stdout.write(f"total: {sum(timings.values()) * 1000:.1f} ms")
@@ -0,0 +1,128 @@
+"""Middleware used by ku-polls."""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from . import routers
+
+PIN_COOKIE = 'polls_primary'
+
+# Views that only read, so they may be served from a replica. The results
+# stream is left out: it reads right after each vote is published.
+REPLICA_VIEWS = {
+    'polls:index', 'polls:detail', 'polls:results', 'polls:results_history',
+    'polls:api_questions', 'polls:api_results',
+}
+
+
+class TimingMiddleware:
+    """
+    Record query count, database time, template time and wall time per URL name.
+
+    The numbers of each request are sent back in a Server-Timing header and
+    kept in the histograms read by ``manage.py polls_stats``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """Wrap the next handler, staying async if it is async."""
+        # Imported here so processes without timing never load polls.timing.
+        from . import timing
+        self.timing = timing
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Time a sync request."""
+        if self.is_async:
+            return self.__acall__(request)
+        with self.timing.measure() as stats:
+            response = self.get_response(request)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        """Time an async request."""
+        with self.timing.measure() as stats:
+            response = await self.get_response(request)
+        return self.finish(request, response, stats)
+
+    def finish(self, request, response, stats):
+        """Add the Server-Timing header and record the request."""
+        response['Server-Timing'] = stats.server_timing()
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.view_name:
+            self.timing.recorder.add(match.view_name, stats)
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Let the read-only polls pages read from replicas (see polls.routers).
+
+    A request that writes, or any request that is not a GET or HEAD, sets
+    a cookie that keeps the client's requests on the primary for the next
+    POLLS_REPLICA_PIN_SECONDS, so a vote is seen on the results page it
+    redirects to even if the replicas lag behind.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """Wrap the next handler, staying async if it is async."""
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Route the reads of a sync request."""
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.POLLS_READ_REPLICAS:
+            return self.get_response(request)
+        routing = routers.Routing(self.replica_for(request))
+        token = routers.current.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.current.reset(token)
+        return self.finish(request, response, routing)
+
+    async def __acall__(self, request):
+        """Route the reads of an async request."""
+        if not settings.POLLS_READ_REPLICAS:
+            return await self.get_response(request)
+        routing = routers.Routing(self.replica_for(request))
+        token = routers.current.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.current.reset(token)
+        return self.finish(request, response, routing)
+
+    def replica_for(self, request):
+        """Return the replica every read of `request` goes to, or None for the primary."""
+        return routers.choose_replica() if self.may_use_replica(request) else None
+
+    def may_use_replica(self, request):
+        """Return True for a GET or HEAD of a read-only polls page from an unpinned client."""
+        if request.method not in ('GET', 'HEAD') or PIN_COOKIE in request.COOKIES:
+            return False
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        return match.view_name in REPLICA_VIEWS
+
+    def finish(self, request, response, routing):
+        """Pin the client to the primary after a write."""
+        if routing.wrote or request.method not in ('GET', 'HEAD'):
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.POLLS_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def reset_tallies(apps, schema_editor):
+    """Recount Choice.votes from Vote rows, dropping any stale counter values."""
+    Choice = apps.get_model('polls', 'Choice')
+    for choice in Choice.objects.annotate(num_votes=models.Count('vote')):
+        if choice.votes != choice.num_votes:
+            Choice.objects.filter(pk=choice.pk).update(votes=choice.num_votes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('polls', '0002_question_end_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Vote',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(reset_tallies, migrations.RunPython.noop),
+    ]
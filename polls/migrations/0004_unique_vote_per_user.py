@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+
+def remove_duplicate_votes(apps, schema_editor):
+    """Keep only the latest vote of each user in each question and recount tallies."""
+    Vote = apps.get_model('polls', 'Vote')
+    Choice = apps.get_model('polls', 'Choice')
+    duplicates = Vote.objects.filter(user__isnull=False).values('user', 'question').annotate(
+        latest=models.Max('id'), total=models.Count('id')
+    ).filter(total__gt=1)
+    for row in duplicates:
+        Vote.objects.filter(user=row['user'], question=row['question']).exclude(pk=row['latest']).delete()
+    for choice in Choice.objects.annotate(num_votes=models.Count('vote')):
+        if choice.votes != choice.num_votes:
+            Choice.objects.filter(pk=choice.pk).update(votes=choice.num_votes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0003_vote'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_votes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.UniqueConstraint(fields=('user', 'question'), name='unique_vote_per_user'),
+        ),
+    ]
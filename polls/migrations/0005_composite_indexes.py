@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_unique_vote_per_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['pub_date', 'end_date'], name='question_pub_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['question', 'choice'], name='vote_question_choice_idx'),
+        ),
+    ]
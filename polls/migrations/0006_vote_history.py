@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_buckets(apps, schema_editor):
+    """Put the existing votes, which have no real time, in the current minute."""
+    Vote = apps.get_model('polls', 'Vote')
+    VoteBucket = apps.get_model('polls', 'VoteBucket')
+    bucket = django.utils.timezone.now().replace(second=0, microsecond=0)
+    VoteBucket.objects.bulk_create(
+        VoteBucket(question_id=row['question'], choice_id=row['choice'], bucket=bucket, votes=row['total'])
+        for row in Vote.objects.values('question', 'choice').annotate(total=models.Count('id'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='voted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='date voted'),
+        ),
+        migrations.CreateModel(
+            name='VoteBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('votes', models.IntegerField(default=0)),
+                ('choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('question', 'bucket', 'choice'), name='unique_vote_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_buckets, migrations.RunPython.noop),
+    ]
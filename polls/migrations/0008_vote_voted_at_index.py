@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0007_result_snapshots'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['voted_at'], name='vote_voted_at_idx'),
+        ),
+    ]
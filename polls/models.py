@@ -1,9 +1,62 @@
 """Create Question and Choice to use in ku-polls."""
 import datetime
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import BooleanField, Case, F, Q, Value, When
 from django.utils import timezone
 from django.contrib.auth.models import User
 
+
+class QuestionQuerySet(models.QuerySet):
+    """
+    Filter questions by state in SQL.
+
+    Every method takes the `now` to compare against, so one request can
+    use a single instant for all of its queries. It defaults to the
+    current time.
+    """
+
+    def published(self, now=None):
+        """Return questions whose pub_date has passed."""
+        return self.filter(pub_date__lte=now or timezone.now())
+
+    def open(self, now=None):
+        """Return questions that can be voted on, like can_vote()."""
+        now = now or timezone.now()
+        return self.filter(pub_date__lte=now, end_date__gte=now)
+
+    def closed(self, now=None):
+        """Return questions whose end_date has passed."""
+        return self.filter(end_date__lt=now or timezone.now())
+
+    def upcoming(self, now=None):
+        """Return questions that are not published yet."""
+        return self.filter(pub_date__gt=now or timezone.now())
+
+    def recent(self, now=None):
+        """Return questions published within the last day, like was_published_recently()."""
+        now = now or timezone.now()
+        return self.filter(pub_date__gte=now - datetime.timedelta(days=1), pub_date__lte=now)
+
+    def with_state(self, now=None):
+        """Annotate is_open and is_recent, computed by the database."""
+        now = now or timezone.now()
+        return self.annotate(
+            is_open=Case(
+                When(Q(pub_date__lte=now, end_date__gte=now), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            is_recent=Case(
+                When(Q(pub_date__gte=now - datetime.timedelta(days=1), pub_date__lte=now), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+
+
+QuestionManager = models.Manager.from_queryset(QuestionQuerySet)
+
+
 class Question(models.Model):
     """Create question in ku-polls."""
 
@@ -11,6 +64,13 @@ class Question(models.Model):
     pub_date = models.DateTimeField('date published')
     end_date = models.DateTimeField('date ended')
 
+    objects = QuestionManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['pub_date', 'end_date'], name='question_pub_end_idx'),
+        ]
+
     def __str__(self):
         """Return question text."""
         return self.question_text
@@ -40,17 +100,151 @@ class Choice(models.Model):
 
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     choice_text = models.CharField(max_length=200)
-
-    @property
-    def votes(self):
-        return self.question.vote_set.filter(choice=self).count()
+    # Denormalized count of Vote rows, kept in step by the vote() view.
+    # Rebuild it with ``manage.py polls_tally`` if it ever drifts.
+    votes = models.IntegerField(default=0)
 
     def __str__(self):
         """Return choice text."""
         return self.choice_text
 
 
+class VoteManager(models.Manager):
+    """Write votes and keep the Choice.votes counters in step."""
+
+    def cast(self, user, question, choice, retry=True, count=True):
+        """
+        Record that `user` voted for `choice` in `question`.
+
+        Return the id of the choice the user voted for before, or None if
+        this is the user's first vote in the question. With count=False the
+        Choice.votes counters are left to the tally engine (polls.tally).
+        """
+        try:
+            with transaction.atomic():
+                now = timezone.now()
+                previous = self.select_for_update().filter(
+                    user=user, question=question
+                ).values_list('choice_id', flat=True).first()
+                if previous is None:
+                    self.create(user=user, question=question, choice=choice, voted_at=now)
+                    if count:
+                        Choice.objects.filter(pk=choice.pk).update(votes=F('votes') + 1)
+                    VoteBucket.objects.add({(question.pk, choice.pk): 1}, now)
+                elif previous != choice.pk:
+                    self.filter(user=user, question=question).update(choice=choice, voted_at=now)
+                    if count:
+                        Choice.objects.filter(pk__in=[previous, choice.pk]).update(
+                            votes=F('votes') + Case(When(pk=choice.pk, then=Value(1)), default=Value(-1))
+                        )
+                    VoteBucket.objects.add({(question.pk, previous): -1, (question.pk, choice.pk): 1}, now)
+                return previous
+        except IntegrityError:
+            # Another request inserted this user's vote first; retry as an update.
+            if not retry:
+                raise
+            return self.cast(user, question, choice, retry=False, count=count)
+
+
 class Vote(models.Model):
+    """Store the choice a user voted for in a question."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, blank=True, null=True,)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    choice = models.ForeignKey(Choice, on_delete=models.CASCADE)
+    voted_at = models.DateTimeField('date voted', default=timezone.now)
+
+    objects = VoteManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'question'], name='unique_vote_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['question', 'choice'], name='vote_question_choice_idx'),
+            # Used by the admin's date hierarchy on large vote tables.
+            models.Index(fields=['voted_at'], name='vote_voted_at_idx'),
+        ]
+
+
+def bucket_start(when):
+    """Return the start of the minute `when` falls in."""
+    return when.replace(second=0, microsecond=0)
+
+
+class VoteBucketManager(models.Manager):
+    """Add vote changes to the per-minute history."""
+
+    def add(self, deltas, when):
+        """
+        Add `deltas`, a dict of (question_id, choice_id) to a vote change, at `when`.
+
+        Must run inside the transaction that writes the votes.
+        """
+        bucket = bucket_start(when)
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        choices = {choice_id: delta for (_, choice_id), delta in deltas.items()}
+        if not choices:
+            return
+        buckets = self.filter(bucket=bucket, choice_id__in=choices)
+        updated = buckets.update(votes=F('votes') + Case(
+            *(When(choice_id=choice_id, then=Value(delta)) for choice_id, delta in choices.items()),
+            default=Value(0),
+        ))
+        if updated < len(choices):
+            # The first vote of a choice in this minute starts its bucket.
+            existing = set(buckets.values_list('choice_id', flat=True))
+            self.bulk_create(
+                self.model(question_id=question_id, choice_id=choice_id, bucket=bucket, votes=delta)
+                for (question_id, choice_id), delta in deltas.items() if choice_id not in existing
+            )
+
+
+class VoteBucket(models.Model):
+    """
+    Net vote change of a choice during one minute.
+
+    A new vote adds one to its choice; a changed vote also takes one from
+    the old choice. Summing a choice's buckets gives its vote count.
+    """
+
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    choice = models.ForeignKey(Choice, on_delete=models.CASCADE)
+    bucket = models.DateTimeField()
+    votes = models.IntegerField(default=0)
+
+    objects = VoteBucketManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['question', 'bucket', 'choice'], name='unique_vote_bucket'),
+        ]
+
+
+class ResultSnapshot(models.Model):
+    """
+    Final results of a closed question, written once by ``manage.py polls_finalize``.
+
+    `choices` has the same shape as polls.cache.get_results(), so the results
+    page can show it as is.
+    """
+
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='snapshot')
+    choices = models.JSONField()
+    total = models.IntegerField()
+    # Where the question's Vote rows went: '' (kept), 'table' or 'file'.
+    archived = models.CharField(max_length=10, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        """Return the question text."""
+        return str(self.question)
+
+
+class ArchivedVote(models.Model):
+    """A vote of a finalized question, moved out of the Vote table."""
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, blank=True, null=True,)
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     choice = models.ForeignKey(Choice, on_delete=models.CASCADE)
+    voted_at = models.DateTimeField('date voted')
@@ -0,0 +1,144 @@
+"""Cache whole pages for anonymous visitors."""
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .cache import bump_results_version, first_version, get_cache, is_shared, results_timeout, results_version
+from .models import Choice, Question
+
+INDEX_GENERATION_KEY = 'polls:page:index:generation'
+
+
+def index_generation():
+    """Return the current generation of the cached index pages."""
+    cache = get_cache()
+    generation = cache.get(INDEX_GENERATION_KEY)
+    if generation is None:
+        cache.add(INDEX_GENERATION_KEY, first_version(), timeout=None)
+        generation = cache.get(INDEX_GENERATION_KEY)
+    return generation
+
+
+def index_page_version():
+    """Return the version of the index pages."""
+    return f'index-{index_generation()}'
+
+
+def results_page_version(pk):
+    """Return the version of a question's results page, bumped by votes and edits."""
+    return f'results-{pk}-{results_version(pk)}'
+
+
+def purge_index():
+    """Make every cached index page stale."""
+    cache = get_cache()
+    try:
+        cache.incr(INDEX_GENERATION_KEY)
+    except ValueError:
+        cache.add(INDEX_GENERATION_KEY, first_version(), timeout=None)
+
+
+def is_anonymous(request):
+    """
+    Return True for a GET from a visitor with no session and no pending messages.
+
+    Only cookies are looked at, so no session is loaded to decide.
+    """
+    return (
+        settings.POLLS_PAGE_CACHE
+        and request.method == 'GET'
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+def page_key(request, version):
+    """Return the cache key of a page at `version`."""
+    return f'polls:page:{version}:{request.get_full_path()}'
+
+
+def page_timeout():
+    """
+    Return how long a cached page may live.
+
+    The purges on votes and edits only reach a process-local cache in the
+    process that made them, so there pages live no longer than results do.
+    """
+    if is_shared(get_cache()):
+        return settings.POLLS_PAGE_CACHE_TIMEOUT
+    return min(settings.POLLS_PAGE_CACHE_TIMEOUT, results_timeout())
+
+
+def store(request, key, response):
+    """Cache a plain 200 response that sets no cookies."""
+    if response.status_code == 200 and not response.streaming and not response.cookies:
+        get_cache().set(key, (response.content, response['Content-Type']), page_timeout())
+
+
+def from_cache(key):
+    """Return the cached page under `key` as a response, or None."""
+    page = get_cache().get(key)
+    if page is None:
+        return None
+    response = HttpResponse(page[0], content_type=page[1])
+    response['X-Page-Cache'] = 'hit'
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def cache_anonymous_page(version_func):
+    """
+    Serve a view from the cache to anonymous visitors.
+
+    version_func(*args, **kwargs) receives the view arguments and returns
+    a version that changes whenever the page content does. Pages also
+    expire after POLLS_PAGE_CACHE_TIMEOUT, since they show time-based state.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if not is_anonymous(request):
+                    return await view(request, *args, **kwargs)
+                key = page_key(request, version_func(*args, **kwargs))
+                response = from_cache(key)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    store(request, key, response)
+                return response
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if not is_anonymous(request):
+                    return view(request, *args, **kwargs)
+                key = page_key(request, version_func(*args, **kwargs))
+                response = from_cache(key)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                    if hasattr(response, 'render'):
+                        response.render()
+                    store(request, key, response)
+                return response
+        return wrapper
+    return decorator
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def purge_question_pages(sender, instance, **kwargs):
+    """Drop the cached index and results pages of a saved or deleted question."""
+    purge_index()
+    bump_results_version(instance.pk)
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def purge_choice_pages(sender, instance, **kwargs):
+    """Drop the cached results pages of a question whose choices changed."""
+    bump_results_version(instance.question_id)
@@ -0,0 +1,82 @@
+"""Limit how fast one user or address can vote, and drop repeated votes."""
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseRedirect
+from django.urls import reverse
+
+from .audit import get_ip
+from .cache import get_cache
+
+
+async def take_token(scope, ident, rate, burst, now=None):
+    """
+    Take a token from the bucket of `ident`, refilled at `rate` per second up to `burst`.
+
+    Return 0 if a token was taken, else the seconds until one is available.
+    A rate of 0 turns the limit off. Buckets live in the results cache and
+    expire once they would be full again, so idle clients cost nothing. The
+    read and write are not atomic, so bursts of concurrent requests may get
+    a few tokens more than `burst`.
+    """
+    if rate <= 0:
+        return 0
+    now = time.time() if now is None else now
+    cache = get_cache()
+    key = f'polls:rate:{scope}:{ident}'
+    tokens, updated = await cache.aget(key, (burst, now))
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens < 1:
+        return (1 - tokens) / rate
+    await cache.aset(key, (tokens - 1, now), math.ceil(burst / rate))
+    return 0
+
+
+def repeat_key(user_id, question_id):
+    """Return the cache key of a user's latest vote in a question."""
+    return f'polls:vote:last:{user_id}:{question_id}'
+
+
+async def remember_vote(user_id, question_id, choice_id):
+    """Remember a vote for POLLS_VOTE_REPEAT_WINDOW seconds so repeats can be dropped."""
+    if settings.POLLS_VOTE_REPEAT_WINDOW > 0:
+        await get_cache().aset(repeat_key(user_id, question_id), str(choice_id), settings.POLLS_VOTE_REPEAT_WINDOW)
+
+
+async def is_repeat(user_id, question_id, choice_id):
+    """Return True if the user just voted for this same choice."""
+    return choice_id is not None and await get_cache().aget(repeat_key(user_id, question_id)) == choice_id
+
+
+def too_many_requests(wait):
+    """Return a 429 response asking the client to retry after `wait` seconds."""
+    response = HttpResponse("Too many votes. Please wait before voting again.", status=429)
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def limit_votes(view):
+    """
+    Guard an async vote view taking `question_id`, for a logged in user.
+
+    A vote for the choice the user just voted for redirects to the results
+    without touching the database. Other votes take a token from the user's
+    bucket, then from the client address's, and get a 429 when either is
+    empty. The cache is used through its async API so the event loop never
+    waits on a network cache.
+    """
+    @wraps(view)
+    async def wrapper(request, question_id):
+        user = await request.auser()
+        if await is_repeat(user.pk, question_id, request.POST.get('choice')):
+            return HttpResponseRedirect(reverse('polls:results', args=(question_id,)))
+        # The address bucket is only charged for votes the user bucket lets through.
+        wait = await take_token('user', user.pk, settings.POLLS_VOTE_USER_RATE, settings.POLLS_VOTE_USER_BURST)
+        if not wait:
+            wait = await take_token('ip', get_ip(request), settings.POLLS_VOTE_IP_RATE, settings.POLLS_VOTE_IP_BURST)
+        if wait:
+            return too_many_requests(wait)
+        return await view(request, question_id)
+    return wrapper
@@ -0,0 +1,84 @@
+"""Send the reads of the polls pages to read replicas."""
+import itertools
+import threading
+from contextvars import ContextVar
+
+from django.conf import settings
+
+current = ContextVar('polls_routing', default=None)
+
+_lock = threading.Lock()
+_config = None
+_cycle = None
+
+
+def choose_replica():
+    """Return the next replica alias, in weighted round-robin order."""
+    global _config, _cycle
+    config = (tuple(settings.POLLS_READ_REPLICAS), tuple(settings.POLLS_REPLICA_WEIGHTS))
+    with _lock:
+        if config != _config:
+            replicas, weights = config
+            weights = weights or (1,) * len(replicas)
+            _cycle = itertools.cycle([alias for alias, weight in zip(replicas, weights) for _ in range(weight)])
+            _config = config
+        return next(_cycle)
+
+
+class Routing:
+    """
+    Where the reads of one request go. Set up by ReplicaMiddleware.
+
+    The replica is chosen once, so every read of the request sees the same
+    replica and its lag: a page count and its rows, or a question and its
+    prefetched choices, never come from two copies.
+    """
+
+    def __init__(self, replica):
+        """Send reads to the `replica` alias, or to the primary if it is None."""
+        self.replica = replica
+        self.wrote = False
+
+
+class ReplicaRouter:
+    """
+    Read from POLLS_READ_REPLICAS during polls page requests, write to default.
+
+    Reads outside such requests (management commands, the vote queue
+    thread) and every read after a write in the same request go to the
+    primary, so a request always sees its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        """
+        Return the request's replica for a polls model while the request may read from one.
+
+        Other apps, such as sessions and auth, always read the primary.
+        """
+        if model._meta.app_label != 'polls':
+            return None
+        routing = current.get()
+        if routing is not None and routing.replica:
+            return routing.replica
+        return None
+
+    def db_for_write(self, model, **hints):
+        """Write to the primary and pin the rest of the request to it."""
+        routing = current.get()
+        if routing is not None:
+            routing.replica = None
+            routing.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allow relations between rows of the primary and its replicas."""
+        databases = {'default', *settings.POLLS_READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Never migrate replicas; they are copies of the primary."""
+        if db in settings.POLLS_READ_REPLICAS:
+            return False
+        return None
@@ -17,5 +17,11 @@ LOGGING = {
             'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
             'propagate': False,
         },
+        # Handled by the queue set up in polls/audit.py, never the console.
+        'polls.audit': {
+            'handlers': [],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
\ No newline at end of file
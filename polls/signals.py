@@ -0,0 +1,20 @@
+"""Audit logins and logouts."""
+from django.contrib.auth import user_logged_in, user_logged_out, user_login_failed
+from django.dispatch import receiver
+
+from .audit import audit, get_ip
+
+
+@receiver(user_logged_in, dispatch_uid='polls_audit_login')
+def login_callback(sender, request, user, **kwargs):
+    audit('login', user=user.username, ip=get_ip(request))
+
+
+@receiver(user_logged_out, dispatch_uid='polls_audit_logout')
+def logout_callback(sender, request, user, **kwargs):
+    audit('logout', user=getattr(user, 'username', None), ip=get_ip(request))
+
+
+@receiver(user_login_failed, dispatch_uid='polls_audit_login_failed')
+def login_failed_callback(sender, credentials, request, **kwargs):
+    audit('login_failed', user=credentials.get('username'), ip=get_ip(request) if request else None)
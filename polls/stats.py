@@ -0,0 +1,83 @@
+"""Counters shared by every process on the host, kept as one file per process."""
+import json
+import os
+import socket
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+GENERATION_FILE = 'generation'
+
+
+class SharedCounters:
+    """
+    Named counts in POLLS_STATS_DIR/`name`, one JSON file per process, summed when read.
+
+    A process only ever replaces its own file, whole, so counts flushed by
+    several processes at once are never lost, unlike incr() on a cache with
+    no atomic increment. reset() removes every file and writes a new
+    generation; a live process that sees it starts its totals over, so counts
+    from before a reset may show again until that process's next flush.
+    """
+
+    def __init__(self, name):
+        """Start with no counts for the counters under the `name` directory."""
+        self.name = name
+        self.lock = threading.Lock()
+        self.totals = Counter()
+        self.pid = None
+        self.token = None
+        self.generation = None
+
+    def directory(self):
+        """Return the directory holding the files of every process."""
+        return Path(settings.POLLS_STATS_DIR) / self.name
+
+    def read_generation(self, directory):
+        """Return the generation written by the last reset(), or None."""
+        try:
+            return (directory / GENERATION_FILE).read_text()
+        except FileNotFoundError:
+            return None
+
+    def add(self, deltas):
+        """Add `deltas`, a mapping of name to count, to this process's totals and write them."""
+        directory = self.directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            if self.pid != os.getpid():
+                # A new process, or a forked one: never write the parent's file.
+                self.pid = os.getpid()
+                self.token = f'{socket.gethostname()}-{self.pid}-{uuid.uuid4().hex[:8]}'
+                self.totals = Counter()
+            generation = self.read_generation(directory)
+            if generation != self.generation:
+                self.generation = generation
+                self.totals = Counter()
+            self.totals.update(deltas)
+            path = directory / f'{self.token}.json'
+            temporary = directory / f'{self.token}.tmp'
+            temporary.write_text(json.dumps(self.totals))
+            os.replace(temporary, path)
+
+    def read(self):
+        """Return the totals of every process, added up, as a Counter."""
+        totals = Counter()
+        for path in self.directory().glob('*.json'):
+            try:
+                totals.update(json.loads(path.read_text()))
+            except (FileNotFoundError, ValueError):
+                # Removed by a reset, or not ours.
+                continue
+        return totals
+
+    def reset(self):
+        """Set every counter of every process back to zero."""
+        directory = self.directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / GENERATION_FILE).write_text(uuid.uuid4().hex)
+        for path in directory.glob('*.json'):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,354 @@
+"""Keep live vote counts in memory and write them to the database now and then."""
+import atexit
+import logging
+import threading
+from array import array
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Choice, Question, ResultSnapshot, Vote
+
+logger = logging.getLogger('polls')
+
+
+class QuestionTally:
+    """Vote counts of one question in an array indexed by choice position, and each voter's choice."""
+
+    __slots__ = ('choices', 'positions', 'counts', 'voters', 'end_date')
+
+    def __init__(self, choices, end_date=None):
+        """Start with no votes for `choices`, a list of (choice_id, choice_text) ending at `end_date`."""
+        self.choices = choices
+        self.end_date = end_date
+        self.positions = {choice_id: position for position, (choice_id, _) in enumerate(choices)}
+        self.counts = array('q', [0]) * len(choices)
+        self.voters = {}
+
+    def add(self, user_id, choice_id):
+        """
+        Make `choice_id` the vote of `user_id`.
+
+        Return the id of the user's previous choice, or None. Raise KeyError
+        if the choice is not one of this question's.
+        """
+        position = self.positions[choice_id]
+        previous = self.voters.get(user_id)
+        if previous != position:
+            if previous is not None:
+                self.counts[previous] -= 1
+            self.counts[position] += 1
+            self.voters[user_id] = position
+        return None if previous is None else self.choices[previous][0]
+
+    def closed(self, now):
+        """Return True once the question's end_date has passed."""
+        return self.end_date is not None and self.end_date < now
+
+    def results(self):
+        """Return the choices with their counts, shaped like polls.cache.get_results()."""
+        return [
+            {'id': choice_id, 'choice_text': choice_text, 'votes': self.counts[position]}
+            for position, (choice_id, choice_text) in enumerate(self.choices)
+        ]
+
+
+class TallyEngine:
+    """
+    Vote counts of every live question, kept in this process.
+
+    Votes are applied in memory and the Choice.votes counters are written
+    every `flush_interval` seconds. Vote rows stay the source of truth:
+    questions are loaded from them, and check() compares against them.
+    Only open questions without a ResultSnapshot are kept; once a question
+    closes its last counts are flushed and its results come from Choice.votes,
+    which polls_finalize freezes. Only correct when one process serves all votes.
+    """
+
+    def __init__(self, flush_interval=5.0, check_interval=0.0):
+        """Create an empty engine; call rebuild() and start() to use it."""
+        self.tallies = {}
+        self.dirty = set()
+        # Questions found closed or finalized, so reads do not look them up again.
+        self.finished = set()
+        self.lock = threading.Lock()
+        self.flush_interval = flush_interval
+        self.check_interval = check_interval
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def load(self, question_ids):
+        """
+        Return fresh tallies of `question_ids`, counted from their Vote rows.
+
+        Questions that are not open or already have a ResultSnapshot are left
+        out: their Vote rows may have been archived. Those that have closed or
+        are finalized are remembered in `finished`. Runs queries, so never
+        call it with the lock held.
+        """
+        now = timezone.now()
+        end_dates, finished = {}, set()
+        questions = Question.objects.published(now).filter(pk__in=question_ids)
+        for question_id, end_date, snapshot in questions.values_list('pk', 'end_date', 'snapshot'):
+            if end_date < now or snapshot is not None:
+                finished.add(question_id)
+            else:
+                end_dates[question_id] = end_date
+        if finished:
+            with self.lock:
+                self.finished |= finished
+        choices = {question_id: [] for question_id in end_dates}
+        rows = Choice.objects.filter(question_id__in=end_dates).order_by('question_id', 'pk')
+        for question_id, choice_id, choice_text in rows.values_list('question_id', 'pk', 'choice_text'):
+            choices[question_id].append((choice_id, choice_text))
+        tallies = {
+            question_id: QuestionTally(question_choices, end_dates[question_id])
+            for question_id, question_choices in choices.items()
+        }
+        votes = Vote.objects.filter(question_id__in=end_dates).values_list('question_id', 'user_id', 'choice_id')
+        for question_id, user_id, choice_id in votes.iterator(chunk_size=5000):
+            tallies[question_id].add(user_id, choice_id)
+        return tallies
+
+    def rebuild(self):
+        """Load every open question, replacing what is in memory."""
+        tallies = self.load(list(Question.objects.open().values_list('pk', flat=True)))
+        with self.lock:
+            self.tallies = tallies
+            self.finished = set()
+            # The counters may have missed the last flush of a previous process.
+            self.dirty = set(tallies)
+
+    def tally(self, question_id):
+        """
+        Return the tally of a question, loading it first if needed.
+
+        Return None for a question that is not open or is finalized. Call
+        without the lock held.
+        """
+        with self.lock:
+            tally = self.tallies.get(question_id)
+            if tally is None and question_id in self.finished:
+                return None
+        if tally is None:
+            tally = self.load([question_id]).get(question_id)
+            if tally is None:
+                return None
+            with self.lock:
+                # Another thread may have loaded it, and counted votes, meanwhile.
+                tally = self.tallies.setdefault(question_id, tally)
+                self.dirty.add(question_id)
+        return tally
+
+    def vote(self, question_id, user_id, choice_id):
+        """
+        Apply a vote and return the user's previous choice id, or None.
+
+        Votes for a question that is not open or is finalized are not counted.
+        """
+        tally = self.tally(question_id)
+        if tally is None:
+            return None
+        with self.lock:
+            # The tally may have been forgotten, or the choice added, since it was loaded.
+            if self.tallies.get(question_id) is tally and choice_id in tally.positions:
+                self.dirty.add(question_id)
+                return tally.add(user_id, choice_id)
+        tally = self.load([question_id]).get(question_id)
+        if tally is None:
+            return None
+        with self.lock:
+            self.tallies[question_id] = tally
+            self.dirty.add(question_id)
+            return tally.add(user_id, choice_id)
+
+    def results(self, question_id):
+        """Return the results of a question from memory, or None if it is not open or is finalized."""
+        tally = self.tally(question_id)
+        if tally is None:
+            return None
+        with self.lock:
+            return tally.results()
+
+    def forget(self, question_ids):
+        """
+        Drop questions whose votes, choices or dates were changed elsewhere; they reload on next use.
+
+        Counts not flushed yet are rebuilt in Choice.votes from the Vote rows
+        first, since a question that was closed is never loaded again.
+        """
+        with self.lock:
+            unflushed = [question_id for question_id in question_ids if question_id in self.dirty]
+            for question_id in question_ids:
+                self.tallies.pop(question_id, None)
+                self.dirty.discard(question_id)
+                self.finished.discard(question_id)
+        if unflushed:
+            votes = Vote.objects.filter(choice=OuterRef('pk')).values('choice').annotate(total=Count('pk'))
+            # Questions whose votes were archived by polls_finalize keep their counters.
+            Choice.objects.filter(question_id__in=unflushed).exclude(question__snapshot__archived__gt='').update(
+                votes=Coalesce(Subquery(votes.values('total')), 0),
+            )
+
+    def flush(self):
+        """
+        Write the counts of questions voted on since the last flush to Choice.votes.
+
+        Questions that have closed are dropped after their last counts are
+        written; from then on their results are read from Choice.votes.
+        """
+        now = timezone.now()
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            counts = {
+                choice_id: tally.counts[position]
+                for tally in (self.tallies[question_id] for question_id in dirty if question_id in self.tallies)
+                for position, (choice_id, _) in enumerate(tally.choices)
+            }
+            closed = {question_id: tally for question_id, tally in self.tallies.items() if tally.closed(now)}
+            for question_id in closed:
+                del self.tallies[question_id]
+            self.finished |= set(closed)
+        if not counts:
+            return 0
+        try:
+            Choice.objects.filter(pk__in=counts).update(votes=Case(
+                *(When(pk=choice_id, then=Value(count)) for choice_id, count in counts.items()),
+                default=F('votes'),
+            ))
+        except Exception:
+            with self.lock:
+                self.dirty |= dirty
+                for question_id, tally in closed.items():
+                    self.tallies.setdefault(question_id, tally)
+                self.finished -= set(closed)
+            raise
+        return len(dirty)
+
+    def check(self):
+        """
+        Compare the counts in memory with the Vote rows.
+
+        Return {question_id: (memory, database)} for every question that
+        differs, each side a dict of choice id to count. Votes arriving
+        during the check may show up as drift that is gone next time.
+        Questions that have closed are skipped; the next flush drops them.
+        """
+        now = timezone.now()
+        with self.lock:
+            memory = {
+                question_id: {choice_id: tally.counts[position] for position, (choice_id, _) in enumerate(tally.choices)}
+                for question_id, tally in self.tallies.items() if not tally.closed(now)
+            }
+        database = {question_id: dict.fromkeys(counts, 0) for question_id, counts in memory.items()}
+        rows = Vote.objects.filter(question_id__in=memory).values('question_id', 'choice_id').annotate(total=Count('id'))
+        for row in rows.values_list('question_id', 'choice_id', 'total'):
+            database[row[0]][row[1]] = row[2]
+        return {
+            question_id: (memory[question_id], database[question_id])
+            for question_id in memory if memory[question_id] != database[question_id]
+        }
+
+    def repair(self):
+        """Reload every open question check() finds drifted. Return their ids."""
+        drifted = list(self.check())
+        if drifted:
+            tallies = self.load(drifted)
+            with self.lock:
+                self.tallies.update(tallies)
+                self.dirty.update(tallies)
+            drifted = list(tallies)
+        return drifted
+
+    def start(self):
+        """Start the thread that flushes and checks in the background."""
+        self.thread = threading.Thread(target=self.run, name='polls-tally-flusher', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Flush every flush_interval and repair every check_interval seconds until stopped."""
+        since_check = 0.0
+        while not self.stopping.wait(self.flush_interval):
+            close_old_connections()
+            try:
+                self.flush()
+                since_check += self.flush_interval
+                if self.check_interval and since_check >= self.check_interval:
+                    since_check = 0.0
+                    for question_id in self.repair():
+                        logger.warning("Tally of question %s drifted from its votes and was reloaded.", question_id)
+            except Exception:
+                logger.exception("Writing vote tallies failed, retrying on the next flush.")
+        self.flush()
+        connection.close()
+
+    def stop(self):
+        """Stop the background thread after a last flush."""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_tally_engine():
+    """Return the process wide tally engine, rebuilt from Vote rows on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            engine = TallyEngine(settings.POLLS_TALLY_FLUSH_INTERVAL, settings.POLLS_TALLY_CHECK_INTERVAL)
+            engine.rebuild()
+            engine.start()
+            atexit.register(engine.stop)
+            _engine = engine
+        return _engine
+
+
+def forget(question_ids):
+    """Make the running engine, if any, reload these questions."""
+    if _engine is not None:
+        _engine.forget(question_ids)
+
+
+def count_vote(question_id, user_id, choice_id):
+    """Count a vote in memory and return the user's previous choice id, or None."""
+    return get_tally_engine().vote(question_id, user_id, choice_id)
+
+
+def cast_vote(user, question, choice):
+    """
+    Write a vote, counting it in memory instead of Choice.votes when POLLS_TALLY_ENGINE is on.
+
+    Return the id of the user's previous choice, like Vote.objects.cast().
+    """
+    if not settings.POLLS_TALLY_ENGINE:
+        return Vote.objects.cast(user, question, choice)
+    previous = Vote.objects.cast(user, question, choice, count=False)
+    count_vote(question.pk, user.pk, choice.pk)
+    return previous
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def forget_changed_choices(sender, instance, **kwargs):
+    """Reload a question whose choices changed."""
+    forget([instance.question_id])
+
+
+@receiver(post_save, sender=Question)
+def forget_changed_question(sender, instance, **kwargs):
+    """Reload a saved question, whose end_date may have moved."""
+    forget([instance.pk])
+
+
+@receiver(post_save, sender=ResultSnapshot)
+def forget_finalized_question(sender, instance, **kwargs):
+    """Stop counting a finalized question; its results are frozen in Choice.votes."""
+    forget([instance.question_id])
@@ -0,0 +1,34 @@
+"""Test runner that keeps the files a test run writes out of the project."""
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+from . import audit
+
+
+class PollsTestRunner(DiscoverRunner):
+    """Run the tests with the audit log and on-disk caches in a temporary directory removed afterwards."""
+
+    def setup_test_environment(self, **kwargs):
+        """Point the audit log and the on-disk caches at a temporary directory."""
+        super().setup_test_environment(**kwargs)
+        self.audit_dir = tempfile.mkdtemp(prefix='polls-test-')
+        caches = {**settings.CACHES}
+        caches['sessions'] = {**caches['sessions'], 'LOCATION': os.path.join(self.audit_dir, 'sessions')}
+        self.audit_settings = override_settings(
+            POLLS_AUDIT_FILE=os.path.join(self.audit_dir, 'audit.jsonl'),
+            POLLS_STATS_DIR=os.path.join(self.audit_dir, 'stats'),
+            CACHES=caches,
+        )
+        self.audit_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        """Stop the audit listener thread and remove the temporary directory."""
+        audit.stop()
+        self.audit_settings.disable()
+        shutil.rmtree(self.audit_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,89 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from polls.models import Choice, Question, Vote, VoteBucket
+
+
+class AdminTest(TestCase):
+    """This class test that the admin pages scale with the number of rows."""
+
+    def setUp(self):
+        """Log in a superuser."""
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="admin", password="secret")
+        self.client.force_login(self.admin)
+
+    def create_votes(self, count):
+        """Create an open question with `count` votes for its only choice and return it."""
+        question = Question.objects.create(
+            question_text="Admin question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        choice = question.choice_set.create(choice_text="Only", votes=count)
+        for number in range(count):
+            user = User.objects.create_user(username=f"voter{question.pk}-{number}")
+            Vote.objects.create(user=user, question=question, choice=choice)
+        return question
+
+    def count_queries(self, url):
+        """Return how many queries GET `url` runs."""
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_question_list_queries_fixed(self):
+        """The question change list runs as many queries for 10 questions as for 1."""
+        self.create_votes(2)
+        few = self.count_queries(reverse('admin:polls_question_changelist'))
+        for _ in range(9):
+            self.create_votes(2)
+        self.assertEqual(self.count_queries(reverse('admin:polls_question_changelist')), few)
+
+    def test_question_list_totals(self):
+        """Vote totals are shown per question."""
+        self.create_votes(3)
+        response = self.client.get(reverse('admin:polls_question_changelist'))
+        self.assertContains(response, '<td class="field-total_votes">3</td>', html=True)
+
+    def test_vote_list_queries_fixed(self):
+        """The vote change list runs as many queries for 10 votes as for 1."""
+        self.create_votes(1)
+        few = self.count_queries(reverse('admin:polls_vote_changelist'))
+        self.create_votes(9)
+        self.assertEqual(self.count_queries(reverse('admin:polls_vote_changelist')), few)
+
+    def act(self, action, *questions):
+        """Run a change list action on `questions`."""
+        return self.client.post(reverse('admin:polls_question_changelist'), {
+            'action': action, '_selected_action': [question.pk for question in questions],
+        })
+
+    def test_close_polls(self):
+        """Closing polls ends voting on them."""
+        question = self.create_votes(1)
+        self.act('close_polls', question)
+        question.refresh_from_db()
+        self.assertFalse(question.can_vote())
+
+    def test_reset_tallies(self):
+        """Resetting tallies deletes the votes and zeroes the counters."""
+        question = self.create_votes(3)
+        other = self.create_votes(1)
+        VoteBucket.objects.create(question=question, choice=question.choice_set.get(), bucket=timezone.now(), votes=3)
+        self.act('reset_tallies', question)
+        self.assertEqual(list(Vote.objects.values_list('question', flat=True)), [other.pk])
+        self.assertEqual(Choice.objects.get(question=question).votes, 0)
+        self.assertFalse(VoteBucket.objects.exists())
+
+    def test_date_hierarchy_uses_index(self):
+        """The first and last vote dates come from the voted_at index."""
+        plan = Vote.objects.order_by('voted_at').values('voted_at')[:1].explain()
+        self.assertIn('vote_voted_at_idx', plan)
@@ -0,0 +1,94 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from polls.cache import bump_results_version
+from polls.models import Question, Vote
+
+
+@override_settings(POLLS_RESULTS_LOCAL_TIMEOUT=2)
+class ResultsApiTest(TestCase):
+    """This class test the JSON questions and results API."""
+
+    def setUp(self):
+        """Create an open question with two choices and one vote."""
+        cache.clear()
+        self.question = Question.objects.create(
+            question_text="Api question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.first = self.question.choice_set.create(choice_text="First")
+        self.question.choice_set.create(choice_text="Second")
+        Vote.objects.cast(User.objects.create_user(username="voter"), self.question, self.first)
+        self.url = reverse('polls:api_results', args=(self.question.id,))
+
+    def test_results(self):
+        """The results carry counts, the total, an ETag and Cache-Control."""
+        response = self.client.get(self.url)
+        data = response.json()
+        self.assertEqual([choice['votes'] for choice in data['choices']], [1, 0])
+        self.assertEqual(data['total'], 1)
+        self.assertTrue(response['ETag'].startswith(f'"q{self.question.id}-v'))
+        self.assertIn('max-age=', response['Cache-Control'])
+
+    def test_not_modified_without_queries(self):
+        """A matching If-None-Match gets a 304 without touching the database."""
+        with mock.patch('polls.api.time.time', return_value=1000.0):
+            etag = self.client.get(self.url)['ETag']
+            with self.assertNumQueries(0):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('max-age=', response['Cache-Control'])
+
+    def test_vote_changes_etag(self):
+        """A new vote version makes the old ETag stale."""
+        etag = self.client.get(self.url)['ETag']
+        bump_results_version(self.question.id)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_question_list(self):
+        """The list links to each question's results and honours its ETag."""
+        response = self.client.get(reverse('polls:api_questions'))
+        self.assertEqual(response.json()['questions'][0]['results'], self.url)
+        response = self.client.get(reverse('polls:api_questions'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_closing_changes_etag(self):
+        """A poll that ends makes the old ETag stale so can_vote is not served stale."""
+        etag = self.client.get(self.url)['ETag']
+        closed = timezone.now() + datetime.timedelta(days=2)
+        with mock.patch('polls.api.timezone.now', return_value=closed), \
+                mock.patch('polls.models.timezone.now', return_value=closed):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].endswith('-closed"'))
+        self.assertFalse(response.json()['can_vote'])
+
+    def test_missing_question_not_cacheable(self):
+        """A 404 is not marked public for reverse proxies."""
+        response = self.client.get(reverse('polls:api_results', args=(self.question.id + 100,)))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+
+    def test_local_cache_etag_expires(self):
+        """With a process-local cache the ETag goes stale after POLLS_RESULTS_LOCAL_TIMEOUT seconds."""
+        with mock.patch('polls.api.time.time', return_value=1000.0):
+            etag = self.client.get(self.url)['ETag']
+        with mock.patch('polls.api.time.time', return_value=1002.0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_shared_cache_etag_has_no_time(self):
+        """A shared results cache sees every vote, so its ETag does not expire."""
+        with mock.patch('polls.api.is_shared', return_value=True):
+            etag = self.client.get(self.url)['ETag']
+        self.assertNotIn('-t', etag)
@@ -0,0 +1,51 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from polls.models import Question, Vote
+
+
+class AsyncViewsTest(TestCase):
+    """This class test the async views through the ASGI handler."""
+
+    def setUp(self):
+        """Create an open question with one choice and a user."""
+        cache.clear()
+        self.question = Question.objects.create(
+            question_text="Async question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.choice = self.question.choice_set.create(choice_text="Only")
+        self.user = User.objects.create_user(username="voter", password="secret")
+
+    async def test_vote_needs_login(self):
+        """An anonymous vote is redirected to the login page."""
+        response = await self.async_client.post(
+            reverse('polls:vote', args=(self.question.id,)), {'choice': self.choice.id}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith('/accounts/login/'))
+
+    async def test_vote_and_results(self):
+        """A logged in vote is recorded and shows on the results page."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            reverse('polls:vote', args=(self.question.id,)), {'choice': self.choice.id}
+        )
+        self.assertRedirects(response, reverse('polls:results', args=(self.question.id,)),
+                             fetch_redirect_response=False)
+        self.assertEqual(await Vote.objects.filter(user=self.user).acount(), 1)
+        response = await self.async_client.get(reverse('polls:results', args=(self.question.id,)))
+        self.assertContains(response, "1 vote")
+
+    async def test_expired_detail_redirects(self):
+        """The detail page of a closed question redirects to the index with a message."""
+        self.question.end_date = timezone.now() - datetime.timedelta(hours=1)
+        await self.question.asave()
+        response = await self.async_client.get(reverse('polls:detail', args=(self.question.id,)))
+        self.assertRedirects(response, reverse('polls:index'), fetch_redirect_response=False)
@@ -0,0 +1,66 @@
+"""Test method and class in ku-polls to use correctly."""
+import json
+import logging
+import os
+import queue
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase
+from polls.audit import (BatchedRotatingFileHandler, BatchingQueueListener, DroppingQueueHandler,
+                         JsonFormatter, audit)
+
+
+class AuditLogTest(SimpleTestCase):
+    """This class test the batched JSON audit log pipeline."""
+
+    def setUp(self):
+        """Create a logger feeding a queue listener that writes to a temp file."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'audit.jsonl')
+        self.records = queue.Queue(2)
+        self.file_handler = BatchedRotatingFileHandler(self.path, 10, maxBytes=200, backupCount=1)
+        self.file_handler.setFormatter(JsonFormatter())
+        self.queue_handler = DroppingQueueHandler(self.records)
+        self.logger = logging.getLogger('polls.tests.audit')
+        self.logger.propagate = False
+        self.logger.addHandler(self.queue_handler)
+        self.addCleanup(self.logger.removeHandler, self.queue_handler)
+
+    def test_records_written_as_json(self):
+        """Each event becomes one JSON line with its fields."""
+        listener = BatchingQueueListener(self.records, self.file_handler, flush_interval=0.01)
+        listener.start()
+        self.logger.warning('vote', extra={'audit': {'user': 'voter', 'question': 1}})
+        listener.stop()
+        self.file_handler.close()
+        with open(self.path) as log:
+            line = json.loads(log.readline())
+        self.assertEqual((line['event'], line['user'], line['question']), ('vote', 'voter', 1))
+
+    def test_full_queue_drops(self):
+        """Records that do not fit in the queue are counted, not waited for."""
+        for number in range(3):
+            self.logger.warning('vote')
+        self.assertEqual(self.queue_handler.dropped, 1)
+
+    def test_rotation(self):
+        """The file is rolled over once a batch makes it too big."""
+        for number in range(10):
+            self.file_handler.handle(logging.makeLogRecord({'msg': 'vote', 'audit': {'n': number}}))
+        self.file_handler.close()
+        self.assertTrue(os.path.exists(self.path + '.1'))
+
+    def test_sampled_out(self):
+        """A zero sample rate logs nothing and starts nothing."""
+        with self.assertNoLogs('polls.audit'):
+            audit('vote', sample=0.0, user='voter')
+
+
+class AuditTestRunnerTest(SimpleTestCase):
+    """This class test that a test run keeps its audit log out of the project."""
+
+    def test_audit_file_outside_project(self):
+        """The test runner points POLLS_AUDIT_FILE at a temporary directory."""
+        self.assertFalse(os.path.abspath(settings.POLLS_AUDIT_FILE).startswith(str(settings.BASE_DIR)))
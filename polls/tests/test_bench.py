@@ -0,0 +1,28 @@
+"""Test method and class in ku-polls to use correctly."""
+from django.test import TransactionTestCase, override_settings
+from polls.bench import measure, seed
+from polls.models import Choice, Question, Vote
+
+
+class BenchTest(TransactionTestCase):
+    """This class test seeding and measuring in polls.bench."""
+
+    def test_seed_counts(self):
+        """seed() creates the asked numbers of rows with matching counters."""
+        question_ids, user_ids = seed(questions=3, choices=2, votes=10)
+        self.assertEqual(Question.objects.count(), 3)
+        self.assertEqual(Choice.objects.count(), 6)
+        self.assertEqual(Vote.objects.count(), 10)
+        self.assertEqual(len(user_ids), 4)
+        self.assertEqual(sum(Choice.objects.values_list('votes', flat=True)), 10)
+
+    @override_settings(ALLOWED_HOSTS=['testserver'], POLLS_PAGE_CACHE=False, POLLS_VOTE_USER_RATE=0, POLLS_VOTE_IP_RATE=0)
+    def test_measure_reports_every_page(self):
+        """measure() returns throughput and latency for every page without errors."""
+        question_ids, user_ids = seed(questions=2, choices=2, votes=4)
+        # One worker: the in-memory test database cannot wait for a locked table.
+        results = measure(question_ids, user_ids, requests=4, workers=1)
+        self.assertEqual(set(results), {'index', 'detail', 'results', 'vote'})
+        for numbers in results.values():
+            self.assertEqual(numbers['requests'], 4)
+            self.assertEqual(numbers['errors'], 0)
@@ -0,0 +1,117 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from polls.cache import get_results, reset_stats, results_timeout, stats
+from polls.models import Question
+from polls.stats import SharedCounters
+
+
+class ResultsCacheTest(TestCase):
+    """This class test the versioned results cache."""
+
+    def setUp(self):
+        """Create an open question with two choices and a logged in user."""
+        cache.clear()
+        reset_stats()
+        self.question = Question.objects.create(
+            question_text="Cached question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.first = self.question.choice_set.create(choice_text="First")
+        self.second = self.question.choice_set.create(choice_text="Second")
+        self.client.force_login(User.objects.create_user(username="voter", password="secret"))
+
+    def vote_for(self, choice):
+        """Post a vote for `choice`."""
+        self.client.post(reverse('polls:vote', args=(self.question.id,)), {'choice': choice.id})
+
+    def test_repeat_lookup_is_hit(self):
+        """The second lookup is served from the cache."""
+        get_results(self.question.id)
+        with self.assertNumQueries(0):
+            get_results(self.question.id)
+        self.assertEqual(stats(), {'hits': 1, 'misses': 1})
+
+    def test_vote_invalidates(self):
+        """A vote makes the next lookup read fresh counts."""
+        get_results(self.question.id)
+        self.vote_for(self.second)
+        votes = [choice['votes'] for choice in get_results(self.question.id)]
+        self.assertEqual(votes, [0, 1])
+
+    def test_same_vote_keeps_cache(self):
+        """Voting again for the same choice does not drop the cached entry."""
+        self.vote_for(self.first)
+        get_results(self.question.id)
+        self.vote_for(self.first)
+        get_results(self.question.id)
+        self.assertEqual(stats(), {'hits': 1, 'misses': 1})
+
+    def test_stats_command(self):
+        """polls_cache_stats prints the counters and can reset them."""
+        get_results(self.question.id)
+        out = StringIO()
+        call_command('polls_cache_stats', '--reset', stdout=out)
+        self.assertIn("misses: 1", out.getvalue())
+        self.assertEqual(stats(), {'hits': 0, 'misses': 0})
+
+    def test_local_cache_short_timeout(self):
+        """Results in a per-process cache expire after POLLS_RESULTS_LOCAL_TIMEOUT."""
+        self.assertEqual(results_timeout(), settings.POLLS_RESULTS_LOCAL_TIMEOUT)
+
+    def test_stats_shared(self):
+        """The counters are kept in files every process can read."""
+        get_results(self.question.id)
+        stats()
+        self.assertEqual(SharedCounters('results').read()['polls:results:misses'], 1)
+
+
+class SharedCountersTest(SimpleTestCase):
+    """This class test the per-process counter files."""
+
+    def setUp(self):
+        """Use an empty stats directory."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings_override = override_settings(POLLS_STATS_DIR=directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_processes_add_up(self):
+        """Counts written by several processes at once are all kept."""
+        code = (
+            "import django; django.setup();"
+            "from polls.stats import SharedCounters;"
+            "counters = SharedCounters('results');"
+            "[counters.add({'hits': 1}) for _ in range(200)]"
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'mysite.settings', 'POLLS_STATS_DIR': settings.POLLS_STATS_DIR}
+        workers = [
+            subprocess.Popen([sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env) for _ in range(4)
+        ]
+        for worker in workers:
+            self.assertEqual(worker.wait(), 0)
+        self.assertEqual(SharedCounters('results').read()['hits'], 800)
+
+    def test_reset(self):
+        """A reset clears every file, and a live process starts over on its next write."""
+        counters = SharedCounters('results')
+        counters.add({'hits': 3})
+        counters.reset()
+        self.assertEqual(counters.read()['hits'], 0)
+        counters.add({'hits': 1})
+        self.assertEqual(counters.read()['hits'], 1)
@@ -0,0 +1,16 @@
+"""Test method and class in ku-polls to use correctly."""
+from django.db import connection
+from django.test import TestCase, override_settings
+from polls.db import configure_sqlite
+
+
+class ConfigureSqliteTest(TestCase):
+    """This class test the PRAGMAs run on new SQLite connections."""
+
+    @override_settings(POLLS_SQLITE_PRAGMAS={'cache_size': -2048})
+    def test_pragmas_applied(self):
+        """Every configured PRAGMA is set on the connection."""
+        configure_sqlite(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -2048)
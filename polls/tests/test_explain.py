@@ -0,0 +1,15 @@
+"""Test method and class in ku-polls to use correctly."""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class PollsExplainTest(TestCase):
+    """This class test the polls_explain management command."""
+
+    def test_hot_queries_use_indexes(self):
+        """No hot query falls back to a table scan."""
+        out = StringIO()
+        call_command('polls_explain', '--fail-on-scan', stdout=out)
+        self.assertIn('vote_question_choice_idx', out.getvalue())
@@ -0,0 +1,85 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+import gzip
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from polls.models import ArchivedVote, Question, ResultSnapshot, Vote
+
+
+class FinalizeTest(TestCase):
+    """This class test result snapshots and vote archival of closed questions."""
+
+    def setUp(self):
+        """Create a closed question with three votes and an open question with one."""
+        cache.clear()
+        now = timezone.now()
+        self.closed = Question.objects.create(
+            question_text="Closed question.",
+            pub_date=now - datetime.timedelta(days=2), end_date=now - datetime.timedelta(days=1),
+        )
+        self.open = Question.objects.create(
+            question_text="Open question.",
+            pub_date=now - datetime.timedelta(days=1), end_date=now + datetime.timedelta(days=1),
+        )
+        first = self.closed.choice_set.create(choice_text="First")
+        second = self.closed.choice_set.create(choice_text="Second")
+        choice = self.open.choice_set.create(choice_text="Only", votes=1)
+        for number, selected in enumerate([first, first, second]):
+            user = User.objects.create_user(username=f"voter{number}")
+            Vote.objects.create(user=user, question=self.closed, choice=selected)
+        Vote.objects.create(user=user, question=self.open, choice=choice)
+
+    def finalize(self, *args):
+        """Run polls_finalize and return its output."""
+        out = StringIO()
+        call_command('polls_finalize', *args, stdout=out)
+        return out.getvalue()
+
+    def test_snapshot_closed_only(self):
+        """Only the closed question gets a snapshot, counted from its votes."""
+        self.finalize()
+        snapshot = ResultSnapshot.objects.get()
+        self.assertEqual(snapshot.question, self.closed)
+        self.assertEqual(snapshot.total, 3)
+        self.assertEqual([choice['votes'] for choice in snapshot.choices], [2, 1])
+        self.assertEqual(Vote.objects.count(), 4)
+
+    def test_finalize_once(self):
+        """A second run leaves finalized questions alone."""
+        self.finalize()
+        self.assertIn("Finalized 0 question(s).", self.finalize())
+
+    def test_archive_to_table(self):
+        """Archived votes leave the Vote table and tallies still check out."""
+        self.finalize('--archive', 'table')
+        self.assertEqual(ArchivedVote.objects.filter(question=self.closed).count(), 3)
+        self.assertEqual(list(Vote.objects.values_list('question', flat=True)), [self.open.pk])
+        call_command('polls_tally', '--check', stdout=StringIO())
+
+    def test_archive_to_file(self):
+        """Archived votes are written as gzipped JSON lines."""
+        with tempfile.TemporaryDirectory() as directory:
+            self.finalize('--archive', 'file', '--archive-dir', directory)
+            path = Path(directory) / f'question-{self.closed.pk}.jsonl.gz'
+            with gzip.open(path, 'rt', encoding='utf-8') as archive:
+                rows = [json.loads(line) for line in archive]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(ResultSnapshot.objects.get().archived, 'file')
+        self.assertFalse(Vote.objects.filter(question=self.closed).exists())
+
+    @override_settings(POLLS_PAGE_CACHE=False)
+    def test_results_from_snapshot(self):
+        """The results page of a finalized question reads only the question and its snapshot."""
+        self.finalize('--archive', 'table')
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('polls:results', args=(self.closed.id,)))
+        self.assertContains(response, "2 votes")
@@ -0,0 +1,58 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+
+from django.contrib.auth.models import User
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from polls.ingest import apply_votes
+from polls.models import Question, Vote, VoteBucket
+
+
+class VoteHistoryTest(TestCase):
+    """This class test the per-minute vote history and its JSON endpoint."""
+
+    def setUp(self):
+        """Create an open question with two choices and two users."""
+        self.question = Question.objects.create(
+            question_text="History question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.first = self.question.choice_set.create(choice_text="First")
+        self.second = self.question.choice_set.create(choice_text="Second")
+        self.alice = User.objects.create_user(username="alice")
+        self.bob = User.objects.create_user(username="bob")
+
+    def bucket_totals(self):
+        """Return the summed history of each choice."""
+        return dict(VoteBucket.objects.values_list('choice').annotate(total=Sum('votes')))
+
+    def test_buckets_sum_to_tallies(self):
+        """New and switched votes keep the history in step with the counters."""
+        Vote.objects.cast(self.alice, self.question, self.first)
+        Vote.objects.cast(self.bob, self.question, self.first)
+        Vote.objects.cast(self.alice, self.question, self.second)
+        self.assertEqual(self.bucket_totals(), {self.first.id: 1, self.second.id: 1})
+        self.assertIsNotNone(Vote.objects.get(user=self.alice).voted_at)
+
+    def test_batched_votes_recorded(self):
+        """Votes written by the queue flusher are added to the history too."""
+        apply_votes([(self.alice.id, self.question.id, self.first.id), (self.bob.id, self.question.id, self.second.id)])
+        self.assertEqual(self.bucket_totals(), {self.first.id: 1, self.second.id: 1})
+
+    def test_history_endpoint(self):
+        """The endpoint returns one point per period with running totals."""
+        Vote.objects.cast(self.alice, self.question, self.first)
+        Vote.objects.cast(self.bob, self.question, self.second)
+        response = self.client.get(reverse('polls:results_history', args=(self.question.id,)), {'resolution': 'day'})
+        data = response.json()
+        self.assertEqual(data['resolution'], 'day')
+        self.assertEqual(len(data['series']), 1)
+        self.assertEqual(data['series'][0]['totals'], {str(self.first.id): 1, str(self.second.id): 1})
+
+    def test_unknown_resolution(self):
+        """An unknown resolution is a bad request."""
+        response = self.client.get(reverse('polls:results_history', args=(self.question.id,)), {'resolution': 'week'})
+        self.assertEqual(response.status_code, 400)
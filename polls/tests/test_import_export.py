@@ -0,0 +1,86 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+from polls.models import Question, Vote
+
+
+class ImportExportTest(TestCase):
+    """This class test the polls_import and polls_export commands."""
+
+    def setUp(self):
+        """Create a question with two choices and one vote."""
+        self.question = Question.objects.create(
+            question_text="Exported question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        first = self.question.choice_set.create(choice_text="First")
+        self.question.choice_set.create(choice_text="Second")
+        Vote.objects.cast(User.objects.create_user(username="voter"), self.question, first)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def round_trip(self, name):
+        """Export questions to `name`, delete them and import the file again."""
+        path = os.path.join(self.directory.name, name)
+        call_command('polls_export', 'questions', path, stderr=StringIO())
+        Question.objects.all().delete()
+        call_command('polls_import', path, stderr=StringIO())
+        question = Question.objects.get()
+        self.assertEqual(question.question_text, "Exported question.")
+        self.assertEqual(question.end_date, self.question.end_date)
+        self.assertEqual([choice.choice_text for choice in question.choice_set.order_by('pk')], ["First", "Second"])
+
+    def test_jsonl_round_trip(self):
+        """Questions exported as JSONL import back unchanged."""
+        self.round_trip('questions.jsonl')
+
+    def test_csv_round_trip(self):
+        """Questions exported as CSV import back unchanged."""
+        self.round_trip('questions.csv')
+
+    def test_export_votes(self):
+        """Votes are exported one JSON object per line."""
+        out = StringIO()
+        call_command('polls_export', 'votes', stdout=out, stderr=StringIO())
+        row = json.loads(out.getvalue())
+        self.assertEqual(row['user'], "voter")
+        self.assertEqual(row['question'], self.question.id)
+
+    def test_export_votes_with_time(self):
+        """Exported votes keep the time they were cast."""
+        out = StringIO()
+        call_command('polls_export', 'votes', stdout=out, stderr=StringIO())
+        row = json.loads(out.getvalue())
+        self.assertEqual(row['voted_at'], Vote.objects.get().voted_at.isoformat())
+
+    def import_text(self, name, text):
+        """Write `text` to `name` and import it."""
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(text)
+        call_command('polls_import', path, stderr=StringIO())
+
+    def test_invalid_json_names_line(self):
+        """A line that is not JSON is reported with its number."""
+        good = json.dumps({'question_text': "Q", 'pub_date': '2024-01-01T00:00:00', 'end_date': '2024-01-02T00:00:00'})
+        with self.assertRaisesMessage(CommandError, "Line 2: invalid JSON"):
+            self.import_text('bad.jsonl', good + '\n{"question_text": \n')
+
+    def test_missing_key_names_line(self):
+        """A record without a field is reported with its line and the field."""
+        with self.assertRaisesMessage(CommandError, "Line 1: missing 'end_date'."):
+            self.import_text('bad.jsonl', json.dumps({'question_text': "Q", 'pub_date': '2024-01-01T00:00:00'}) + '\n')
+
+    def test_bad_csv_date_names_line(self):
+        """A CSV row with an invalid date is reported with its line."""
+        with self.assertRaisesMessage(CommandError, "Line 2: Invalid date: 'soon'"):
+            self.import_text('bad.csv', 'question_text,pub_date,end_date,choices\nQ,soon,2024-01-02T00:00:00,A|B\n')
@@ -25,15 +25,16 @@ class QuestionIndexViewTests(TestCase):
         response = self.client.get(reverse('polls:index'))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "No polls are available")
-        self.assertQuerysetEqual(response.context['latest_question_list'], [])
+        self.assertQuerySetEqual(response.context['latest_question_list'], [])
 
     def test_past_question(self):
         """Questions with a pub_date in the past are displayed on the index page."""
         create_question(question_text="Past question.", days=-30)
         response = self.client.get(reverse('polls:index'))
-        self.assertQuerysetEqual(
+        self.assertQuerySetEqual(
             response.context['latest_question_list'],
-            ['<Question: Past question.>']
+            ['<Question: Past question.>'],
+            transform=repr
         )
 
     def test_future_question(self):
@@ -41,16 +42,17 @@ class QuestionIndexViewTests(TestCase):
         create_question(question_text="Future question.", days=30)
         response = self.client.get(reverse('polls:index'))
         self.assertContains(response, "No polls are available.")
-        self.assertQuerysetEqual(response.context['latest_question_list'], [])
+        self.assertQuerySetEqual(response.context['latest_question_list'], [])
 
     def test_future_question_and_past_question(self):
         """Even if both past and future questions exist,only past questions are displayed."""
         create_question(question_text="Past question.", days=-30)
         create_question(question_text="Future question.", days=30)
         response = self.client.get(reverse('polls:index'))
-        self.assertQuerysetEqual(
+        self.assertQuerySetEqual(
             response.context['latest_question_list'],
-            ['<Question: Past question.>']
+            ['<Question: Past question.>'],
+            transform=repr
         )
 
     def test_two_past_questions(self):
@@ -58,6 +60,20 @@ class QuestionIndexViewTests(TestCase):
         create_question(question_text="Past question 1.", days=-30)
         create_question(question_text="Past question 2.", days=-5)
         response = self.client.get(reverse('polls:index'))
-        self.assertQuerysetEqual(
+        self.assertQuerySetEqual(
             response.context['latest_question_list'],
-            ['<Question: Past question 2.>', '<Question: Past question 1.>'])
+            ['<Question: Past question 2.>', '<Question: Past question 1.>'],
+            transform=repr)
+
+    def test_index_is_paginated(self):
+        """Only POLLS_PAGE_SIZE questions are shown on one page."""
+        for number in range(3):
+            create_question(question_text=f"Past question {number}.", days=-30 + number)
+        with self.settings(POLLS_PAGE_SIZE=2):
+            response = self.client.get(reverse('polls:index'), {'page': 2})
+        self.assertTrue(response.context['is_paginated'])
+        self.assertQuerySetEqual(
+            response.context['latest_question_list'],
+            ['<Question: Past question 0.>'],
+            transform=repr
+        )
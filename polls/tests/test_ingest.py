@@ -0,0 +1,108 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from polls.ingest import VoteQueue, apply_votes
+from polls.models import Question, Vote
+
+
+def create_poll(test):
+    """Create an open question with two choices and two users on `test`."""
+    test.question = Question.objects.create(
+        question_text="Batched question.",
+        pub_date=timezone.now() - datetime.timedelta(days=1),
+        end_date=timezone.now() + datetime.timedelta(days=1),
+    )
+    test.first = test.question.choice_set.create(choice_text="First")
+    test.second = test.question.choice_set.create(choice_text="Second")
+    test.alice = User.objects.create_user(username="alice")
+    test.bob = User.objects.create_user(username="bob")
+
+
+class ApplyVotesTest(TestCase):
+    """This class test writing a batch of queued votes."""
+
+    def setUp(self):
+        """Create the poll and users."""
+        create_poll(self)
+
+    def tallies(self):
+        """Return the vote counters of both choices."""
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        return self.first.votes, self.second.votes
+
+    def test_last_vote_wins(self):
+        """Only the last vote of a user in the batch is kept."""
+        apply_votes([
+            (self.alice.id, self.question.id, self.first.id),
+            (self.bob.id, self.question.id, self.first.id),
+            (self.alice.id, self.question.id, self.second.id),
+        ])
+        self.assertEqual(Vote.objects.get(user=self.alice).choice, self.second)
+        self.assertEqual(self.tallies(), (1, 1))
+
+    def test_batch_switches_existing_vote(self):
+        """A batch vote replaces a vote already in the database."""
+        Vote.objects.cast(self.alice, self.question, self.first)
+        touched = apply_votes([(self.alice.id, self.question.id, self.second.id)])
+        self.assertEqual(touched, {self.question.id})
+        self.assertEqual(self.tallies(), (0, 1))
+
+    def test_repeat_vote_changes_nothing(self):
+        """A batch vote equal to the stored one touches no question."""
+        Vote.objects.cast(self.alice, self.question, self.first)
+        self.assertEqual(apply_votes([(self.alice.id, self.question.id, self.first.id)]), set())
+        self.assertEqual(self.tallies(), (1, 0))
+
+
+class VoteQueueTest(TransactionTestCase):
+    """This class test the background vote queue."""
+
+    def setUp(self):
+        """Create the poll and users."""
+        create_poll(self)
+
+    def test_stop_drains_queue(self):
+        """Stopping the queue writes every vote queued before."""
+        votes = VoteQueue(maxsize=10, batch_size=2, flush_interval=0.05)
+        self.assertTrue(votes.submit(self.alice.id, self.question.id, self.first.id))
+        self.assertTrue(votes.submit(self.bob.id, self.question.id, self.second.id))
+        votes.stop()
+        self.assertEqual(Vote.objects.count(), 2)
+        self.assertFalse(votes.submit(self.alice.id, self.question.id, self.second.id))
+
+
+@override_settings(POLLS_VOTE_QUEUE=True, POLLS_PAGE_CACHE=False)
+class QueuedVoteViewTest(TransactionTestCase):
+    """This class test the vote page with the vote queue on."""
+
+    def setUp(self):
+        """Create the poll and log alice in."""
+        cache.clear()
+        create_poll(self)
+        self.client.force_login(self.alice)
+        self.url = reverse('polls:vote', args=(self.question.id,))
+
+    def test_vote_is_queued(self):
+        """A vote is written by the queue, not by the view."""
+        votes = VoteQueue(maxsize=10, batch_size=10, flush_interval=0.05)
+        with mock.patch('polls.views.get_vote_queue', return_value=votes):
+            response = self.client.post(self.url, {'choice': self.second.id})
+        votes.stop()
+        self.assertRedirects(response, reverse('polls:results', args=(self.question.id,)))
+        self.assertEqual(Vote.objects.get(user=self.alice).choice, self.second)
+
+    def test_full_queue_refuses_vote(self):
+        """A full queue gets a 503 with Retry-After and nothing is written behind it."""
+        votes = mock.Mock(**{'submit.return_value': False})
+        with mock.patch('polls.views.get_vote_queue', return_value=votes):
+            response = self.client.post(self.url, {'choice': self.second.id})
+        self.assertEqual(response.status_code, 503)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertFalse(Vote.objects.exists())
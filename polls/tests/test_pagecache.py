@@ -0,0 +1,72 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from polls.models import Question
+from polls.pagecache import page_timeout
+
+
+class PageCacheTest(TestCase):
+    """This class test the page cache for anonymous visitors."""
+
+    def setUp(self):
+        """Create an open question with two choices."""
+        cache.clear()
+        self.question = Question.objects.create(
+            question_text="Cached page.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.choice = self.question.choice_set.create(choice_text="First")
+        self.results_url = reverse('polls:results', args=(self.question.id,))
+
+    def test_anonymous_repeat_is_hit(self):
+        """The second anonymous visit is served without any query."""
+        self.client.get(self.results_url)
+        self.client.get(reverse('polls:index'))
+        with self.assertNumQueries(0):
+            results = self.client.get(self.results_url)
+            index = self.client.get(reverse('polls:index'))
+        self.assertEqual(results['X-Page-Cache'], 'hit')
+        self.assertContains(index, "Cached page.")
+
+    def test_vote_purges_results(self):
+        """A vote makes the cached results page stale."""
+        self.client.get(self.results_url)
+        voter = User.objects.create_user(username="voter", password="secret")
+        voter_client = self.client_class()
+        voter_client.force_login(voter)
+        voter_client.post(reverse('polls:vote', args=(self.question.id,)), {'choice': self.choice.id})
+        response = self.client.get(self.results_url)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, "1 vote")
+
+    def test_question_save_purges_index(self):
+        """Editing a question makes the cached index stale."""
+        self.client.get(reverse('polls:index'))
+        self.question.question_text = "Edited page."
+        self.question.save()
+        self.assertContains(self.client.get(reverse('polls:index')), "Edited page.")
+
+    def test_logged_in_not_cached(self):
+        """A visitor with a session never gets a cached page."""
+        self.client.get(reverse('polls:index'))
+        self.client.force_login(User.objects.create_user(username="member", password="secret"))
+        response = self.client.get(reverse('polls:index'))
+        self.assertNotIn('X-Page-Cache', response)
+
+    @override_settings(POLLS_PAGE_CACHE_TIMEOUT=60, POLLS_RESULTS_LOCAL_TIMEOUT=2)
+    def test_local_cache_short_timeout(self):
+        """Pages in a process-local cache live only as long as local results, since other processes' purges miss them."""
+        self.assertEqual(page_timeout(), 2)
+
+    @override_settings(POLLS_PAGE_CACHE_TIMEOUT=60)
+    def test_shared_cache_full_timeout(self):
+        """A shared cache sees every purge, so pages keep POLLS_PAGE_CACHE_TIMEOUT."""
+        with mock.patch('polls.pagecache.is_shared', return_value=True):
+            self.assertEqual(page_timeout(), 60)
@@ -0,0 +1,67 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from polls.models import Question
+
+
+def create_questions(count, choices=3):
+    """Create `count` open questions with `choices` choices each."""
+    now = timezone.now()
+    questions = []
+    for number in range(count):
+        question = Question.objects.create(
+            question_text=f"Question {number}.",
+            pub_date=now - datetime.timedelta(days=1, minutes=number),
+            end_date=now + datetime.timedelta(days=1),
+        )
+        for choice in range(choices):
+            question.choice_set.create(choice_text=f"Choice {choice}")
+        questions.append(question)
+    return questions
+
+
+class QueryBudgetTest(TestCase):
+    """This class test that page query counts do not grow with data size."""
+
+    def setUp(self):
+        """Start every test with an empty results cache."""
+        cache.clear()
+
+    def test_index_queries_fixed(self):
+        """Index runs a count and a page query however many questions exist."""
+        create_questions(25)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('polls:index'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_queries_fixed(self):
+        """Detail page loads the question and all its choices in two queries."""
+        question = create_questions(1, choices=10)[0]
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('polls:detail', args=(question.id,)))
+        self.assertContains(response, "Choice 9")
+
+    def test_results_queries_fixed(self):
+        """Results page loads the question and all its choices in two queries."""
+        question = create_questions(1, choices=10)[0]
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('polls:results', args=(question.id,)))
+        self.assertContains(response, "Choice 9")
+
+    @override_settings(POLLS_PAGE_CACHE=False)
+    def test_cached_results_query(self):
+        """Once cached, the results page only loads the question."""
+        question = create_questions(1, choices=10)[0]
+        self.client.get(reverse('polls:results', args=(question.id,)))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('polls:results', args=(question.id,)))
+        self.assertContains(response, "Choice 9")
+
+    def test_missing_question_detail(self):
+        """Detail page for an unknown question returns 404."""
+        response = self.client.get(reverse('polls:detail', args=(1,)))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,47 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from polls.models import Question
+
+
+def create_question(question_text, days, end_days):
+    """Create a question published `days` from now and ending `end_days` from now."""
+    now = timezone.now()
+    return Question.objects.create(
+        question_text=question_text,
+        pub_date=now + datetime.timedelta(days=days),
+        end_date=now + datetime.timedelta(days=end_days),
+    )
+
+
+class QuestionStateTest(TestCase):
+    """This class test the QuestionManager state filters."""
+
+    def setUp(self):
+        """Create an open, a closed, an upcoming and a recent question."""
+        self.open = create_question("Open.", -5, 5)
+        self.closed = create_question("Closed.", -5, -1)
+        self.upcoming = create_question("Upcoming.", 2, 5)
+        self.recent = create_question("Recent.", -0.5, 5)
+
+    def test_states(self):
+        """Each filter returns the questions in that state."""
+        self.assertQuerySetEqual(Question.objects.open(), [self.open, self.recent], ordered=False)
+        self.assertQuerySetEqual(Question.objects.closed(), [self.closed])
+        self.assertQuerySetEqual(Question.objects.upcoming(), [self.upcoming])
+        self.assertQuerySetEqual(Question.objects.recent(), [self.recent])
+
+    def test_with_state_matches_methods(self):
+        """The annotations agree with can_vote() and was_published_recently()."""
+        for question in Question.objects.with_state():
+            self.assertEqual(question.is_open, question.can_vote())
+            self.assertEqual(question.is_recent, question.was_published_recently())
+
+    def test_index_open_only(self):
+        """The index with ?state=open lists only questions that can be voted on."""
+        response = self.client.get(reverse('polls:index'), {'state': 'open'})
+        self.assertQuerySetEqual(response.context['latest_question_list'], [self.recent, self.open])
+        self.assertNotContains(response, "Closed.")
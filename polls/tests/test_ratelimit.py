@@ -0,0 +1,87 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from polls.models import Question, Vote
+from polls.ratelimit import take_token
+
+
+class TokenBucketTest(TestCase):
+    """This class test the token bucket."""
+
+    def setUp(self):
+        """Start with no buckets."""
+        cache.clear()
+
+    async def test_burst_then_wait(self):
+        """A full bucket allows `burst` requests, then says how long to wait."""
+        self.assertEqual([await take_token('test', 1, 2, 3, now=100) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(await take_token('test', 1, 2, 3, now=100), 0.5)
+        self.assertEqual(await take_token('test', 1, 2, 3, now=100.5), 0)
+
+    async def test_buckets_are_separate(self):
+        """Each ident has its own bucket."""
+        await take_token('test', 1, 1, 1, now=100)
+        self.assertEqual(await take_token('test', 2, 1, 1, now=100), 0)
+
+    async def test_zero_rate_is_unlimited(self):
+        """A rate of 0 never limits."""
+        self.assertEqual([await take_token('test', 1, 0, 1) for _ in range(5)], [0] * 5)
+
+
+@override_settings(POLLS_VOTE_USER_RATE=0.01, POLLS_VOTE_USER_BURST=2)
+class VoteLimitTest(TestCase):
+    """This class test rate limiting and repeat dropping on the vote page."""
+
+    def setUp(self):
+        """Create an open question with two choices and a logged in user."""
+        cache.clear()
+        self.question = Question.objects.create(
+            question_text="Limited question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.first = self.question.choice_set.create(choice_text="First")
+        self.second = self.question.choice_set.create(choice_text="Second")
+        self.client.force_login(User.objects.create_user(username="voter", password="secret"))
+
+    def vote_for(self, choice):
+        """Post a vote for `choice` and return the response."""
+        return self.client.post(reverse('polls:vote', args=(self.question.id,)), {'choice': choice.id})
+
+    def test_repeat_skips_database(self):
+        """Voting again for the same choice only loads the session and user."""
+        self.vote_for(self.first)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.vote_for(self.first)
+        self.assertRedirects(response, reverse('polls:results', args=(self.question.id,)))
+        self.assertFalse([query for query in queries if 'polls_' in query['sql']])
+
+    def test_changed_vote_not_dropped(self):
+        """A vote for another choice is written."""
+        self.vote_for(self.first)
+        self.vote_for(self.second)
+        self.assertEqual(Vote.objects.get().choice, self.second)
+
+    @override_settings(POLLS_VOTE_USER_BURST=1)
+    def test_rejected_vote_keeps_address_tokens(self):
+        """A vote the user bucket rejects takes no token from the address bucket."""
+        self.vote_for(self.first)
+        self.vote_for(self.second)
+        self.assertEqual(cache.get('polls:rate:ip:127.0.0.1')[0], settings.POLLS_VOTE_IP_BURST - 1)
+
+    def test_over_limit(self):
+        """Votes past the burst get 429 with Retry-After and are not written."""
+        self.vote_for(self.first)
+        self.vote_for(self.second)
+        response = self.vote_for(self.first)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(Vote.objects.get().choice, self.second)
@@ -0,0 +1,98 @@
+"""Test method and class in ku-polls to use correctly."""
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from polls.middleware import PIN_COOKIE, ReplicaMiddleware
+from polls.models import Choice, Question
+from polls.routers import Routing, choose_replica, current
+
+
+@override_settings(POLLS_READ_REPLICAS=['replica1', 'replica2'], POLLS_REPLICA_WEIGHTS=[2, 1])
+class ReplicaRouterTest(SimpleTestCase):
+    """This class test which database the polls reads go to."""
+
+    def route(self, replica='replica1'):
+        """Start routing a request and return its Routing."""
+        routing = Routing(replica)
+        token = current.set(routing)
+        self.addCleanup(current.reset, token)
+        return routing
+
+    def test_weighted_round_robin(self):
+        """Replicas are chosen in turn, as often as their weight."""
+        chosen = [choose_replica() for _ in range(6)]
+        self.assertEqual(chosen.count('replica1'), 4)
+        self.assertEqual(chosen.count('replica2'), 2)
+
+    def test_one_replica_per_request(self):
+        """Every read of a request goes to the replica chosen for it."""
+        self.route('replica2')
+        self.assertEqual({router.db_for_read(Question) for _ in range(6)}, {'replica2'})
+
+    def test_outside_request_reads_primary(self):
+        """Reads with no request, like commands or the vote queue, use the primary."""
+        self.assertEqual(router.db_for_read(Question), 'default')
+
+    def test_other_apps_read_primary(self):
+        """Sessions and users are not polls models, so they stay on the primary."""
+        self.route()
+        self.assertEqual(router.db_for_read(User), 'default')
+        self.assertEqual(router.db_for_read(Session), 'default')
+        self.assertEqual(router.db_for_read(Question), 'replica1')
+
+    def test_write_pins_primary(self):
+        """After a write the rest of the request reads the primary."""
+        routing = self.route()
+        router.db_for_write(Question)
+        self.assertEqual(router.db_for_read(Question), 'default')
+        self.assertTrue(routing.wrote)
+
+    def test_no_migrations_on_replicas(self):
+        """Replicas are never migrated."""
+        self.assertFalse(router.allow_migrate('replica1', 'polls'))
+        self.assertTrue(router.allow_migrate('default', 'polls'))
+
+
+@override_settings(POLLS_READ_REPLICAS=['replica1'], POLLS_REPLICA_WEIGHTS=[])
+class ReplicaMiddlewareTest(SimpleTestCase):
+    """This class test which requests may read from a replica."""
+
+    def setUp(self):
+        """Build a middleware whose view reports where a read would go."""
+        self.factory = RequestFactory()
+        self.middleware = ReplicaMiddleware(lambda request: HttpResponse(router.db_for_read(Question)))
+
+    def test_polls_get_uses_replica(self):
+        """A GET of a polls page reads from a replica."""
+        response = self.middleware(self.factory.get('/polls/1/results/'))
+        self.assertEqual(response.content, b'replica1')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_other_pages_use_primary(self):
+        """Pages outside the polls read views read from the primary."""
+        for path in ('/admin/', '/polls/1/results/stream/', '/missing/'):
+            self.assertEqual(self.middleware(self.factory.get(path)).content, b'default')
+
+    def test_post_pins_client(self):
+        """A POST reads from the primary and pins the client to it."""
+        response = self.middleware(self.factory.post('/polls/1/vote/'))
+        self.assertEqual(response.content, b'default')
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_pinned_client_reads_primary(self):
+        """A client with the pin cookie reads from the primary."""
+        request = self.factory.get('/polls/1/results/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(self.middleware(request).content, b'default')
+
+    @override_settings(POLLS_READ_REPLICAS=['replica1', 'replica2'])
+    def test_reads_share_one_replica(self):
+        """Two reads of one request, like a page count and its rows, go to the same replica."""
+        middleware = ReplicaMiddleware(
+            lambda request: HttpResponse(f'{router.db_for_read(Question)} {router.db_for_read(Choice)}')
+        )
+        for _ in range(4):
+            first, second = middleware(self.factory.get('/polls/')).content.decode().split()
+            self.assertEqual(first, second)
@@ -0,0 +1,93 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from polls.checks import check_shared_session_cache
+from polls.models import Question
+
+
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+    MESSAGE_STORAGE='django.contrib.messages.storage.cookie.CookieStorage',
+    POLLS_PAGE_CACHE=False,
+)
+class AnonymousSessionTest(TestCase):
+    """This class test that anonymous page views never write a session."""
+
+    def setUp(self):
+        """Create an open and a closed question."""
+        cache.clear()
+        now = timezone.now()
+        self.open = Question.objects.create(
+            question_text="Open question.",
+            pub_date=now - datetime.timedelta(days=1), end_date=now + datetime.timedelta(days=1),
+        )
+        self.closed = Question.objects.create(
+            question_text="Closed question.",
+            pub_date=now - datetime.timedelta(days=2), end_date=now - datetime.timedelta(days=1),
+        )
+
+    def test_reads_create_no_session(self):
+        """Index, detail and results pages set no session cookie and write no row."""
+        for url in (
+            reverse('polls:index'),
+            reverse('polls:detail', args=(self.open.id,)),
+            reverse('polls:results', args=(self.open.id,)),
+        ):
+            response = self.client.get(url)
+            self.assertNotIn('sessionid', response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_message_uses_cookie(self):
+        """The expired question warning is carried in the messages cookie, not a session."""
+        response = self.client.get(reverse('polls:detail', args=(self.closed.id,)))
+        self.assertIn('messages', response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+
+class ClearSessionsTest(TestCase):
+    """This class test deleting expired sessions in batches."""
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+    def test_deletes_expired_only(self):
+        """Expired sessions go, live ones stay."""
+        now = timezone.now()
+        for number in range(5):
+            Session.objects.create(session_key=f'old{number}', session_data='', expire_date=now - datetime.timedelta(days=1))
+        Session.objects.create(session_key='live', session_data='', expire_date=now + datetime.timedelta(days=1))
+        out = StringIO()
+        call_command('polls_clearsessions', batch_size=2, stdout=out)
+        self.assertIn("Deleted 5 expired session(s).", out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_cookie_sessions(self):
+        """With signed cookie sessions there is nothing to delete."""
+        out = StringIO()
+        call_command('polls_clearsessions', stdout=out)
+        self.assertIn("nothing to delete", out.getvalue())
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+class SessionCacheCheckTest(SimpleTestCase):
+    """This class test that cached_db sessions must live in a cache shared by every process."""
+
+    def test_shared_cache_passes(self):
+        """The shipped on-disk sessions cache is shared."""
+        self.assertEqual(check_shared_session_cache(None), [])
+
+    def test_local_cache_refused(self):
+        """A LocMem session cache is an error with cached_db."""
+        with override_settings(SESSION_CACHE_ALIAS='default'):
+            self.assertEqual([error.id for error in check_shared_session_cache(None)], ['polls.E003'])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db', SESSION_CACHE_ALIAS='default')
+    def test_db_sessions_ignore_cache(self):
+        """Database sessions do not use the cache at all."""
+        self.assertEqual(check_shared_session_cache(None), [])
@@ -0,0 +1,29 @@
+"""Test method and class in ku-polls to use correctly."""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from polls.management.commands.polls_startup_profile import by_package, parse_importtime
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   django.utils
+import time:       300 |        420 | django
+import time:        50 |         50 | polls.views
+"""
+
+
+class StartupProfileTest(SimpleTestCase):
+    """This class test the startup profile command."""
+
+    def test_parse_importtime(self):
+        """Every module line is read, the header is skipped."""
+        modules = parse_importtime(IMPORTTIME)
+        self.assertEqual(modules['django'], (300, 420))
+        self.assertEqual(by_package(modules), [('django', 420), ('polls', 50)])
+
+    def test_command(self):
+        """A fresh worker starts and serves both requests."""
+        out = StringIO()
+        call_command('polls_startup_profile', path='/accounts/login/', limit=3, stdout=out)
+        self.assertIn('first request', out.getvalue())
+        self.assertIn('200 OK, 200 OK', out.getvalue())
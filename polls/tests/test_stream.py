@@ -0,0 +1,68 @@
+"""Test method and class in ku-polls to use correctly."""
+import asyncio
+import datetime
+import json
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from polls.broker import LocalBroker, get_broker
+from polls.models import Question
+
+
+class LocalBrokerTest(TestCase):
+    """This class test the in-process vote notification broker."""
+
+    async def test_publish_wakes_subscriber(self):
+        """A publish from another thread wakes the subscriber once."""
+        broker = LocalBroker()
+        subscription = broker.subscribe(1)
+        thread = threading.Thread(target=lambda: [broker.publish(1) for _ in range(5)])
+        thread.start()
+        thread.join()
+        self.assertTrue(await subscription.wait(1))
+        self.assertFalse(await subscription.wait(0.01))
+
+    async def test_other_question_not_notified(self):
+        """Subscribers only hear about their own question."""
+        broker = LocalBroker()
+        subscription = broker.subscribe(1)
+        broker.publish(2)
+        self.assertFalse(await subscription.wait(0.01))
+
+    async def test_close_unsubscribes(self):
+        """A closed subscription is dropped from the broker."""
+        broker = LocalBroker()
+        broker.subscribe(1).close()
+        self.assertEqual(dict(broker.subscribers), {})
+
+
+class ResultsStreamTest(TestCase):
+    """This class test the Server-Sent Events results stream."""
+
+    def setUp(self):
+        """Create an open question with one choice."""
+        cache.clear()
+        self.question = Question.objects.create(
+            question_text="Live question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.question.choice_set.create(choice_text="Only")
+
+    async def test_stream_sends_results(self):
+        """The stream starts with the current results and then follows votes."""
+        with self.settings(POLLS_STREAM_MAX_RATE=100):
+            response = await self.async_client.get(reverse('polls:results_stream', args=(self.question.id,)))
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            stream = aiter(response.streaming_content)
+            first = (await anext(stream)).decode()
+            self.assertTrue(first.startswith("event: results\n"))
+            data = json.loads(first.split("data: ", 1)[1])
+            self.assertEqual(data['choices'][0]['choice_text'], "Only")
+            get_broker().publish(self.question.id)
+            second = (await asyncio.wait_for(anext(stream), 1)).decode()
+            self.assertTrue(second.startswith("event: results\n"))
+            await stream.aclose()
@@ -0,0 +1,112 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from polls.models import Choice, Question, Vote
+
+
+class VoteTallyTest(TestCase):
+    """This class test the vote counter kept on Choice."""
+
+    def setUp(self):
+        """Create an open question with two choices and a logged in user."""
+        cache.clear()
+        self.question = Question.objects.create(
+            question_text="Tally question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.first = self.question.choice_set.create(choice_text="First")
+        self.second = self.question.choice_set.create(choice_text="Second")
+        self.user = User.objects.create_user(username="voter", password="secret")
+        self.client.force_login(self.user)
+
+    def vote_for(self, choice):
+        """Post a vote for `choice`."""
+        return self.client.post(reverse('polls:vote', args=(self.question.id,)), {'choice': choice.id})
+
+    def test_vote_increments_counter(self):
+        """A new vote adds one to the selected choice."""
+        self.vote_for(self.first)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.votes, 1)
+
+    def test_switch_vote_moves_counter(self):
+        """Changing a vote moves the count from the old choice to the new one."""
+        self.vote_for(self.first)
+        self.vote_for(self.second)
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.votes, self.second.votes), (0, 1))
+
+    def test_same_vote_keeps_counter(self):
+        """Voting for the same choice again does not change the count."""
+        self.vote_for(self.first)
+        self.vote_for(self.first)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.votes, 1)
+
+    def test_results_do_not_count_votes(self):
+        """The results page reads counters instead of counting Vote rows."""
+        self.vote_for(self.first)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('polls:results', args=(self.question.id,)))
+        self.assertContains(response, "1 vote")
+
+    def test_rebuild_fixes_drift(self):
+        """polls_tally rewrites counters that disagree with the Vote rows."""
+        self.vote_for(self.first)
+        Choice.objects.filter(pk=self.first.pk).update(votes=7)
+        with self.assertRaises(CommandError):
+            call_command('polls_tally', '--check', stdout=StringIO())
+        call_command('polls_tally', stdout=StringIO())
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.votes, 1)
+        call_command('polls_tally', '--check', stdout=StringIO())
+
+
+class VoteCastTest(TestCase):
+    """This class test Vote.objects.cast and the one vote per user rule."""
+
+    def setUp(self):
+        """Create an open question with two choices and a user."""
+        self.question = Question.objects.create(
+            question_text="Cast question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.first = self.question.choice_set.create(choice_text="First")
+        self.second = self.question.choice_set.create(choice_text="Second")
+        self.user = User.objects.create_user(username="voter", password="secret")
+
+    def test_cast_reports_previous_choice(self):
+        """cast() returns None for a first vote and the old choice id after."""
+        self.assertIsNone(Vote.objects.cast(self.user, self.question, self.first))
+        self.assertEqual(Vote.objects.cast(self.user, self.question, self.second), self.first.id)
+        self.assertEqual(Vote.objects.cast(self.user, self.question, self.second), self.second.id)
+        self.assertEqual(Vote.objects.filter(user=self.user).count(), 1)
+
+    def test_switch_round_trips(self):
+        """
+        Switching a vote takes one select, one vote update, one counter update and one history update.
+
+        The other two queries are the savepoint around them.
+        """
+        Vote.objects.cast(self.user, self.question, self.first)
+        Vote.objects.cast(User.objects.create_user(username="other"), self.question, self.second)
+        with self.assertNumQueries(6):
+            Vote.objects.cast(self.user, self.question, self.second)
+
+    def test_duplicate_vote_rejected(self):
+        """The database refuses a second vote row for the same user and question."""
+        Vote.objects.create(user=self.user, question=self.question, choice=self.first)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Vote.objects.create(user=self.user, question=self.question, choice=self.second)
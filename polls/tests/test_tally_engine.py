@@ -0,0 +1,146 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from polls import tally
+from polls.cache import get_results
+from polls.models import Question, ResultSnapshot, Vote
+from polls.tally import QuestionTally, TallyEngine
+
+
+class QuestionTallyTest(SimpleTestCase):
+    """This class test the counts of one question."""
+
+    def setUp(self):
+        """Create a tally of two choices."""
+        self.tally = QuestionTally([(10, "First"), (20, "Second")])
+
+    def test_new_vote(self):
+        """A first vote adds one and has no previous choice."""
+        self.assertIsNone(self.tally.add(1, 10))
+        self.assertEqual(list(self.tally.counts), [1, 0])
+
+    def test_changed_vote(self):
+        """A changed vote moves the count and returns the old choice."""
+        self.tally.add(1, 10)
+        self.assertEqual(self.tally.add(1, 20), 10)
+        self.assertEqual(list(self.tally.counts), [0, 1])
+
+    def test_same_vote(self):
+        """Voting for the same choice again changes nothing."""
+        self.tally.add(1, 10)
+        self.tally.add(1, 10)
+        self.assertEqual(list(self.tally.counts), [1, 0])
+
+
+@override_settings(POLLS_TALLY_ENGINE=True)
+class TallyEngineTest(TestCase):
+    """This class test the in-memory tally engine."""
+
+    def setUp(self):
+        """Create an open question with one vote and an engine that is not running."""
+        cache.clear()
+        self.question = Question.objects.create(
+            question_text="Live question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.first = self.question.choice_set.create(choice_text="First")
+        self.second = self.question.choice_set.create(choice_text="Second")
+        Vote.objects.create(user=User.objects.create_user(username="early"), question=self.question, choice=self.first)
+        self.engine = TallyEngine()
+        self.engine.rebuild()
+        tally._engine = self.engine
+        self.addCleanup(setattr, tally, '_engine', None)
+        self.user = User.objects.create_user(username="voter", password="secret")
+        self.client.force_login(self.user)
+
+    def votes(self):
+        """Return the results as {choice_text: votes}."""
+        return {choice['choice_text']: choice['votes'] for choice in get_results(self.question.id)}
+
+    def test_rebuilt_from_votes(self):
+        """Counts start from the Vote rows."""
+        self.assertEqual(self.votes(), {"First": 1, "Second": 0})
+
+    def test_results_without_queries(self):
+        """Results are read from memory."""
+        with self.assertNumQueries(0):
+            get_results(self.question.id)
+
+    def test_vote_counted_in_memory(self):
+        """A vote shows in the results at once and in Choice.votes after a flush."""
+        self.client.post(reverse('polls:vote', args=(self.question.id,)), {'choice': self.second.id})
+        self.assertEqual(self.votes(), {"First": 1, "Second": 1})
+        self.second.refresh_from_db()
+        self.assertEqual(self.second.votes, 0)
+        self.engine.flush()
+        self.second.refresh_from_db()
+        self.assertEqual(self.second.votes, 1)
+
+    def test_check_and_repair(self):
+        """Votes written behind the engine's back are found and reloaded."""
+        Vote.objects.create(user=self.user, question=self.question, choice=self.second)
+        self.assertEqual(list(self.engine.check()), [self.question.id])
+        self.assertEqual(self.engine.repair(), [self.question.id])
+        self.assertEqual(self.engine.check(), {})
+        self.assertEqual(self.votes(), {"First": 1, "Second": 1})
+
+    def test_new_choice_reloads(self):
+        """A choice added after loading can be voted for."""
+        third = self.question.choice_set.create(choice_text="Third")
+        self.engine.vote(self.question.id, self.user.id, third.id)
+        self.assertEqual(self.votes()["Third"], 1)
+
+    def test_closed_question_keeps_counters(self):
+        """A closed question is flushed and dropped, so archiving its votes and repairing cannot zero it."""
+        self.engine.vote(self.question.id, self.user.id, self.second.id)
+        later = timezone.now() + datetime.timedelta(days=2)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.engine.flush()
+            self.assertNotIn(self.question.id, self.engine.tallies)
+            # polls_finalize --archive moves the Vote rows out.
+            Vote.objects.filter(question=self.question).delete()
+            self.assertEqual(self.engine.repair(), [])
+            self.engine.flush()
+            self.assertNotIn(self.question.id, self.engine.tallies)
+            self.assertEqual(self.votes(), {"First": 1, "Second": 1})
+
+    def test_finalized_question_not_loaded(self):
+        """A question with a snapshot is dropped and its results come from the counters, rebuilt from its votes."""
+        ResultSnapshot.objects.create(question=self.question, choices=[], total=0)
+        self.assertNotIn(self.question.id, self.engine.tallies)
+        self.assertIsNone(self.engine.results(self.question.id))
+        self.assertEqual(self.votes(), {"First": 1, "Second": 0})
+
+    def test_close_then_flush(self):
+        """Counts still in memory reach Choice.votes when a poll is closed and forgotten."""
+        self.client.post(reverse('polls:vote', args=(self.question.id,)), {'choice': self.second.id})
+        # What the admin "Close selected polls" action does.
+        Question.objects.filter(pk=self.question.id).update(end_date=timezone.now())
+        tally.forget([self.question.id])
+        self.engine.flush()
+        self.second.refresh_from_db()
+        self.assertEqual(self.second.votes, 1)
+        self.assertEqual(self.votes(), {"First": 1, "Second": 1})
+
+    def test_close_by_saving(self):
+        """Saving a question with a past end_date keeps the votes counted in memory."""
+        self.client.post(reverse('polls:vote', args=(self.question.id,)), {'choice': self.second.id})
+        self.question.end_date = timezone.now() - datetime.timedelta(minutes=1)
+        self.question.save()
+        self.engine.flush()
+        self.assertEqual(self.votes(), {"First": 1, "Second": 1})
+
+    def test_closed_question_looked_up_once(self):
+        """Reads of a closed question do not ask the database whether it is open each time."""
+        self.question.end_date = timezone.now() - datetime.timedelta(minutes=1)
+        self.question.save()
+        get_results(self.question.id)
+        with self.assertNumQueries(0):
+            get_results(self.question.id)
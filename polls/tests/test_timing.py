@@ -0,0 +1,87 @@
+"""Test method and class in ku-polls to use correctly."""
+import datetime
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from polls.models import Question
+from polls.stats import SharedCounters
+from polls.timing import record_query, recorder, reset_stats
+
+TIMED_TEMPLATES = [{**settings.TEMPLATES[0], 'BACKEND': 'polls.timing.TimedDjangoTemplates'}]
+
+
+@override_settings(
+    MIDDLEWARE=['polls.middleware.TimingMiddleware', *settings.MIDDLEWARE],
+    TEMPLATES=TIMED_TEMPLATES,
+    POLLS_TIMING=True,
+)
+class TimingMiddlewareTest(TestCase):
+    """This class test the per-view timing middleware."""
+
+    def setUp(self):
+        """Create a question and start with no recorded stats."""
+        cache.clear()
+        recorder.histograms.clear()
+        reset_stats()
+        self.question = Question.objects.create(
+            question_text="Timed question.",
+            pub_date=timezone.now() - datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        wrapper = connection.execute_wrapper(record_query)
+        wrapper.__enter__()
+        self.addCleanup(wrapper.__exit__, None, None, None)
+
+    def test_server_timing_header(self):
+        """The response says how many queries the view ran."""
+        response = self.client.get(reverse('polls:results', args=(self.question.id,)))
+        self.assertIn('db;desc="2 queries"', response['Server-Timing'])
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+
+    def test_stats_command(self):
+        """polls_stats lists the views that were requested."""
+        self.client.get(reverse('polls:index'))
+        self.client.get(reverse('polls:index'))
+        out = StringIO()
+        call_command('polls_stats', '--reset', stdout=out)
+        self.assertIn("polls:index (2 requests)", out.getvalue())
+        out = StringIO()
+        call_command('polls_stats', stdout=out)
+        self.assertIn("No requests recorded.", out.getvalue())
+
+
+    def test_stats_of_other_processes(self):
+        """Histograms written by another process are added to this one's."""
+        self.client.get(reverse('polls:index'))
+        # What another process's Recorder.flush() writes to its own file.
+        SharedCounters('timing').add({'polls:index:wall_ms:0': 1, 'polls:index:wall_ms:total': 500})
+        out = StringIO()
+        call_command('polls_stats', stdout=out)
+        self.assertIn("polls:index (2 requests)", out.getvalue())
+
+
+class TimingNotLoadedTest(SimpleTestCase):
+    """This class test that polls.timing is only loaded when timing is on."""
+
+    def test_worker_without_timing(self):
+        """A worker that builds its middleware with POLLS_TIMING off never imports polls.timing."""
+        code = (
+            "import sys, django; django.setup();"
+            "from django.core.handlers.wsgi import WSGIHandler; WSGIHandler();"
+            "print('polls.timing' in sys.modules)"
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'mysite.settings', 'POLLS_TIMING': 'False'}
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(result.stdout.strip(), 'False')
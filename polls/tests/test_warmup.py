@@ -0,0 +1,32 @@
+"""Test method and class in ku-polls to use correctly."""
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import engines
+from django.test import SimpleTestCase
+from polls.warmup import template_names, warm_up
+
+
+class WarmUpTest(SimpleTestCase):
+    """This class test the worker warm-up."""
+
+    def test_template_names(self):
+        """The polls and registration templates are found, others are not."""
+        names = template_names()
+        self.assertIn('polls/index.html', names)
+        self.assertIn('registration/login.html', names)
+        self.assertNotIn('admin/base_site.html', names)
+
+    def test_templates_cached(self):
+        """After warm-up the cached loader holds every polls template."""
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+        warm_up()
+        self.assertTrue(set(template_names()) <= set(loader.get_template_cache))
+
+    def test_command(self):
+        """The command reports every step."""
+        out = StringIO()
+        call_command('polls_warmup', stdout=out)
+        self.assertIn('polls/results.html', out.getvalue())
+        self.assertIn('urls', out.getvalue())
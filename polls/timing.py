@@ -0,0 +1,201 @@
+"""Per-view request timing kept in fixed-size histograms."""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+from .stats import SharedCounters
+
+MS_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+BOUNDS = {
+    'queries': (0, 1, 2, 3, 5, 10, 20, 50, 100),
+    'db_ms': MS_BOUNDS,
+    'template_ms': MS_BOUNDS,
+    'wall_ms': MS_BOUNDS,
+}
+
+current = ContextVar('polls_request_stats', default=None)
+
+
+class RequestStats:
+    """What one request has spent so far."""
+
+    def __init__(self):
+        """Start with nothing spent."""
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.wall = 0.0
+
+    def metrics(self):
+        """Return the values recorded in the histograms."""
+        return {
+            'queries': self.queries,
+            'db_ms': self.db * 1000,
+            'template_ms': self.template * 1000,
+            'wall_ms': self.wall * 1000,
+        }
+
+    def server_timing(self):
+        """Return the value of a Server-Timing header."""
+        return (
+            f'db;desc="{self.queries} queries";dur={self.db * 1000:.1f}, '
+            f'tpl;dur={self.template * 1000:.1f}, '
+            f'total;dur={self.wall * 1000:.1f}'
+        )
+
+
+@contextmanager
+def measure():
+    """Collect the stats of the code run inside, including sync_to_async calls."""
+    stats = RequestStats()
+    token = current.set(stats)
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.wall = time.perf_counter() - start
+        current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper that adds each query to the current request."""
+    stats = current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db += time.perf_counter() - start
+        stats.queries += 1
+
+
+class TimedTemplate:
+    """A template whose render time is added to the current request."""
+
+    def __init__(self, template):
+        """Wrap a backend template."""
+        self.template = template
+
+    def render(self, context=None, request=None):
+        """Render the wrapped template, timing it."""
+        stats = current.get()
+        if stats is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            stats.template += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing every render."""
+
+    def from_string(self, template_code):
+        """Return a timed template compiled from a string."""
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        """Return a timed template loaded by name."""
+        return TimedTemplate(super().get_template(template_name))
+
+
+class Histogram:
+    """Counts of values falling between fixed bounds, plus their sum."""
+
+    def __init__(self, bounds):
+        """Create an empty histogram; the last bucket holds values above every bound."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def add(self, value):
+        """Count one value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+
+class Recorder:
+    """Histograms per URL name, added to the shared counters every so often."""
+
+    def __init__(self):
+        """Start empty."""
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.flushed = time.monotonic()
+
+    def add(self, url_name, stats):
+        """Record one request and flush if POLLS_TIMING_FLUSH_INTERVAL has passed."""
+        with self.lock:
+            for metric, value in stats.metrics().items():
+                key = (url_name, metric)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(BOUNDS[metric])
+                self.histograms[key].add(value)
+            due = time.monotonic() - self.flushed >= settings.POLLS_TIMING_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Add the local counts to the shared ones and start over."""
+        with self.lock:
+            histograms, self.histograms = self.histograms, {}
+            self.flushed = time.monotonic()
+        deltas = {}
+        for (url_name, metric), histogram in histograms.items():
+            for bucket, count in enumerate(histogram.counts):
+                if count:
+                    deltas[f'{url_name}:{metric}:{bucket}'] = count
+            deltas[f'{url_name}:{metric}:total'] = round(histogram.total * 1000)
+        if deltas:
+            shared_counters.add(deltas)
+
+
+shared_counters = SharedCounters('timing')
+recorder = Recorder()
+
+
+def read_stats():
+    """
+    Return the shared histograms of every process.
+
+    The result maps url name to metric to a dict with the bucket counts,
+    the number of requests and the sum of the values.
+    """
+    totals = shared_counters.read()
+    # URL names may hold colons; the metric and bucket never do.
+    url_names = {key.rsplit(':', 2)[0] for key in totals}
+    result = {}
+    for url_name in url_names:
+        for metric, bounds in BOUNDS.items():
+            prefix = f'{url_name}:{metric}:'
+            counts = [totals[prefix + str(bucket)] for bucket in range(len(bounds) + 1)]
+            result.setdefault(url_name, {})[metric] = {
+                'bounds': bounds,
+                'counts': counts,
+                'count': sum(counts),
+                'total': totals[prefix + 'total'] / 1000,
+            }
+    return result
+
+
+def reset_stats():
+    """Delete the shared histograms."""
+    shared_counters.reset()
+
+
+def percentile(histogram, fraction):
+    """Return the upper bound of the bucket holding the given fraction of values."""
+    seen = 0
+    for bucket, count in enumerate(histogram['counts']):
+        seen += count
+        if count and seen >= fraction * histogram['count']:
+            bounds = histogram['bounds']
+            return bounds[bucket] if bucket < len(bounds) else float('inf')
+    return 0
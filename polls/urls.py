@@ -1,12 +1,16 @@
 """Use to connect path in polls."""
 from django.urls import path
 
-from . import views
+from . import api, views
 
 app_name = 'polls'
 urlpatterns = [
     path('', views.IndexView.as_view(), name='index'),
     path('<int:pk>/', views.vote_for_poll, name='detail'),
     path('<int:pk>/results/', views.ResultsView.as_view(), name='results'),
+    path('<int:pk>/results/stream/', views.results_stream, name='results_stream'),
+    path('<int:pk>/results/history/', views.results_history, name='results_history'),
     path('<int:question_id>/vote/', views.vote, name='vote'),
+    path('api/questions/', api.question_list, name='api_questions'),
+    path('api/questions/<int:pk>/results/', api.question_results, name='api_results'),
 ]
@@ -1,72 +1,159 @@
 """Use to redirect to any page in ku-polls."""
-import logging.config
-
-from .settings import LOGGING
-from django.http import HttpResponseRedirect
-from django.shortcuts import get_object_or_404, render
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMinute
+from django.http import HttpResponseBadRequest, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, render
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
 from django.utils import timezone
 from django.contrib import messages
-from .models import Choice, Question
+from .audit import audit, get_ip
+from .broker import get_broker
+from .cache import bump_results_version, get_results
+from .ingest import get_vote_queue, queue_full
+from .models import Choice, Question, VoteBucket
+from .pagecache import cache_anonymous_page, index_page_version, results_page_version
+from .ratelimit import limit_votes, remember_vote
+from .tally import cast_vote, count_vote
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import user_logged_in, user_logged_out, user_login_failed
-from django.dispatch import receiver
-
-
-logging.config.dictConfig(LOGGING)
-logger = logging.getLogger('polls')
-
-
-def get_ip(request):
-    http_x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if http_x_forwarded_for:
-        ip = http_x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
 
 
+@method_decorator(cache_anonymous_page(index_page_version), name='dispatch')
 class IndexView(generic.ListView):
     """Redirect to index page."""
 
     template_name = 'polls/index.html'
     context_object_name = 'latest_question_list'
 
+    def get_paginate_by(self, queryset):
+        """Return the page size from the POLLS_PAGE_SIZE setting."""
+        return settings.POLLS_PAGE_SIZE
+
     def get_queryset(self):
-        """Return the last five published questions."""
-        return Question.objects.filter(
-            pub_date__lte=timezone.now()
-        ).order_by('-pub_date')
+        """
+        Return published questions, newest first, marked whether they can be voted.
+
+        With ?state=open only questions that can be voted on are returned.
+        """
+        now = timezone.now()
+        questions = Question.objects.with_state(now)
+        if self.request.GET.get('state') == 'open':
+            questions = questions.open(now)
+        else:
+            questions = questions.published(now)
+        return questions.order_by('-pub_date')
+
+    def get_context_data(self, **kwargs):
+        """Add the state filter so page links can keep it."""
+        context = super().get_context_data(**kwargs)
+        context['state'] = self.request.GET.get('state', '')
+        return context
 
 
-def vote_for_poll(request, pk):
+async def vote_for_poll(request, pk):
     """
     Redirect to detail page.
 
     If this question can't vote will redirect to index page.
     """
-    question = Question.objects.get(pk=pk)
+    question = await aget_object_or_404(Question.objects.prefetch_related('choice_set'), pk=pk)
     if not (question.can_vote()):
         messages.warning(request, "This question is expired.")
         return HttpResponseRedirect(reverse('polls:index'))
     return render(request, 'polls/detail.html', {"question": question})
 
 
-class ResultsView(generic.DetailView):
+class ResultsView(generic.View):
     """Redirect to results page."""
 
-    model = Question
     template_name = 'polls/results.html'
 
+    @method_decorator(cache_anonymous_page(results_page_version))
+    async def get(self, request, pk):
+        """
+        Render the question with its choices.
+
+        Closed questions with a snapshot from polls_finalize are shown from
+        it; other questions are read from the results cache.
+        """
+        question = await aget_object_or_404(Question.objects.select_related('snapshot'), pk=pk)
+        if not question.can_vote() and hasattr(question, 'snapshot'):
+            choices = question.snapshot.choices
+        else:
+            choices = await sync_to_async(get_results)(question.pk)
+        return render(request, self.template_name, {'question': question, 'choices': choices})
+
+
+HISTORY_RESOLUTIONS = {'minute': TruncMinute, 'hour': TruncHour, 'day': TruncDay}
+
+
+async def results_history(request, pk):
+    """
+    Return how the results of a question changed over time as JSON.
+
+    ?resolution= is minute, hour (the default) or day. Each point has the
+    net vote change of every choice in that period and the running totals.
+    """
+    question = await aget_object_or_404(Question, pk=pk)
+    resolution = request.GET.get('resolution', 'hour')
+    if resolution not in HISTORY_RESOLUTIONS:
+        return HttpResponseBadRequest(f"resolution must be one of {', '.join(HISTORY_RESOLUTIONS)}")
+    choices = [choice async for choice in Choice.objects.filter(question=question).order_by('pk').values('id', 'choice_text')]
+    rows = VoteBucket.objects.filter(question=question).annotate(
+        time=HISTORY_RESOLUTIONS[resolution]('bucket')
+    ).values('time', 'choice_id').annotate(change=Sum('votes')).order_by('time')
+    series, totals = [], {choice['id']: 0 for choice in choices}
+    async for row in rows:
+        if not series or series[-1]['time'] != row['time'].isoformat():
+            series.append({'time': row['time'].isoformat(), 'votes': {}, 'totals': {}})
+        totals[row['choice_id']] = totals.get(row['choice_id'], 0) + row['change']
+        series[-1]['votes'][row['choice_id']] = row['change']
+        series[-1]['totals'] = dict(totals)
+    return JsonResponse({'question': question.pk, 'resolution': resolution, 'choices': choices, 'series': series})
+
+
+async def results_stream(request, pk):
+    """
+    Send the results of a question as Server-Sent Events whenever someone votes.
+
+    The stream never ends, so it has to be served through ASGI.
+    """
+    question = await aget_object_or_404(Question, pk=pk)
+    interval = 1 / settings.POLLS_STREAM_MAX_RATE
+
+    async def events():
+        subscription = get_broker().subscribe(question.pk)
+        try:
+            while True:
+                choices = await sync_to_async(get_results)(question.pk)
+                yield f"event: results\ndata: {json.dumps({'question': question.pk, 'choices': choices})}\n\n"
+                # Votes that arrive while we sleep are sent together afterwards.
+                await asyncio.sleep(interval)
+                while not await subscription.wait(settings.POLLS_STREAM_KEEPALIVE):
+                    yield ": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 
 @login_required
-def vote(request, question_id):
+@limit_votes
+async def vote(request, question_id):
     """Redirect to vote page."""
-    user = request.user
-    question = get_object_or_404(Question, pk=question_id)
+    user = await request.auser()
+    question = await aget_object_or_404(Question.objects.prefetch_related('choice_set'), pk=question_id)
     try:
-        selected_choice = question.choice_set.get(pk=request.POST['choice'])
+        selected_choice = await question.choice_set.aget(pk=request.POST['choice'])
     except (KeyError, Choice.DoesNotExist):
         return render(request, 'polls/detail.html', {
             'question': question,
@@ -76,26 +163,18 @@ def vote(request, question_id):
         if not (question.can_vote()):
             messages.warning(request, "This question is expired.")
             return HttpResponseRedirect(reverse('polls:index'))
-        if question.vote_set.filter(user=user).exists():
-            vote = question.vote_set.get(user=user)
-            vote.choice = selected_choice
-            vote.save()
-        else:
-            selected_choice.vote_set.create(user=user, question=question)
-        logger.info(f'User: {request.user.username} ip: {get_ip(request)} voted the poll, question id = {question.id}. ')
+        if settings.POLLS_VOTE_QUEUE:
+            if not get_vote_queue().submit(user.pk, question.pk, selected_choice.pk):
+                # Writing it directly could be overwritten by an older vote still queued.
+                return queue_full()
+            # The flusher thread writes the vote and updates the results shortly.
+            if settings.POLLS_TALLY_ENGINE:
+                await sync_to_async(count_vote)(question.pk, user.pk, selected_choice.pk)
+        # cast_vote needs a transaction, which only runs in sync code.
+        elif await sync_to_async(cast_vote)(user, question, selected_choice) != selected_choice.pk:
+            await sync_to_async(bump_results_version)(question.pk)
+            get_broker().publish(question.pk)
+        await remember_vote(user.pk, question.pk, selected_choice.pk)
+        audit('vote', sample=settings.POLLS_AUDIT_VOTE_SAMPLE_RATE,
+              user=user.username, ip=get_ip(request), question=question.id)
         return HttpResponseRedirect(reverse('polls:results', args=(question_id,)))
-
-
-@receiver(user_logged_in)
-def login_callback(sender, request, user, **kwargs):
-    logger.info(f"User {user.username} ip: {get_ip(request)} logged in. ")
-
-
-@receiver(user_logged_out)
-def logout_callback(sender, request, user, **kwargs):
-    logger.info(f"User {user.username} ip: {get_ip(request)} logged out.")
-
-
-@receiver(user_login_failed)
-def login_failed_callback(sender, credentials, request, **kwargs):
-    logger.warning(f"User {request.POST['username']} ip: {get_ip(request)} login failed.")
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""Compile templates and load the URLconf before a worker takes traffic."""
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.checks.urls import check_resolver
+from django.core.exceptions import ImproperlyConfigured
+from django.template import engines
+from django.template.loader import get_template
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver, reverse
+
+from .tally import get_tally_engine
+
+TEMPLATE_PATTERNS = ('polls/*.html', 'registration/*.html')
+
+
+def template_names():
+    """Return the names of the templates matching TEMPLATE_PATTERNS in every template directory."""
+    dirs = [Path(directory) for engine in engines.all() for directory in engine.dirs]
+    dirs += [Path(directory) for directory in get_app_template_dirs('templates')]
+    names = set()
+    for directory in dirs:
+        for pattern in TEMPLATE_PATTERNS:
+            names.update(path.relative_to(directory).as_posix() for path in directory.glob(pattern))
+    return sorted(names)
+
+
+def warm_up():
+    """
+    Compile the polls templates into the cached loader, load the URLconf
+    and, with POLLS_TALLY_ENGINE on, rebuild the tallies.
+
+    Return the seconds each step took, by template name and 'urls'.
+    Raise ImproperlyConfigured if the URLconf has errors.
+    """
+    timings = {}
+    for name in template_names():
+        start = time.perf_counter()
+        get_template(name)
+        timings[name] = time.perf_counter() - start
+    start = time.perf_counter()
+    errors = [error for error in check_resolver(get_resolver()) if error.is_serious()]
+    if errors:
+        raise ImproperlyConfigured('; '.join(str(error) for error in errors))
+    reverse('polls:index')
+    timings['urls'] = time.perf_counter() - start
+    if settings.POLLS_TALLY_ENGINE:
+        start = time.perf_counter()
+        get_tally_engine()
+        timings['tally'] = time.perf_counter() - start
+    return timings